@@ -0,0 +1,156 @@
+import sys, os, json, time, random, argparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+sys.path.insert(0, HERE)
+
+from nmcli_parse import split_terse, parse_wifi_list, parse_profile_ssids, aggregate
+
+# SSID yang sering merusak parser split(':') biasa
+TRICKY = ["Cafe:5G", "C:\\Users\\wifi", "back\\slash", "Rumah Budi 2.4", "Kos 🏠 Lt.3",
+          "a:b:c:d", "trailing\\", ":leading", "DIRECT-xy-HP:Printer", "   "]
+
+
+# ================= FIXTURE =================
+def escape(value):
+    return value.replace("\\", "\\\\").replace(":", "\\:")
+
+
+def make_scan(bssids, ssids, seed=1):
+    # Gedung apartemen padat: banyak SSID, tiap SSID beberapa BSSID di
+    # 2.4/5/6 GHz, plus jaringan tersembunyi dan SSID berisi ':' / '\'
+    rnd = random.Random(seed)
+    names = TRICKY + [f"APT-{rnd.randrange(100, 999)}-{i}" for i in range(max(0, ssids - len(TRICKY)))]
+    names = names[:ssids] + [""]
+    freqs = [2412, 2437, 2462, 5180, 5240, 5500, 5745, 5955, 6115]
+    security = ["WPA2", "WPA1 WPA2", "WPA2 WPA3", "WPA3", "WPA2 802.1X", "--"]
+
+    lines = []
+    for i in range(bssids):
+        mac = ":".join(f"{rnd.randrange(256):02X}" for _ in range(6))
+        fields = ["*" if i == 0 else " ", escape(mac), escape(rnd.choice(names)),
+                  f"{rnd.choice(freqs)} MHz", str(rnd.randrange(5, 100)), rnd.choice(security)]
+        lines.append(":".join(fields))
+    return "\n".join(lines) + "\n"
+
+
+def legacy_scan(aps):
+    # Scan yang sama dalam layout parser lama: -t -f ACTIVE,SSID,BARS,SIGNAL
+    # (-t juga meng-escape ':' dan '\' secara default)
+    bars = ["____", "▂___", "▂▄__", "▂▄▆_", "▂▄▆█"]
+    return "".join(f"{'yes' if ap['active'] else 'no'}:{escape(ap['ssid'])}:"
+                   f"{bars[min(4, (ap['signal'] + 19) // 20)]}:{ap['signal']}\n" for ap in aps)
+
+
+# ================= MEASUREMENTS =================
+def naive_parse(text):
+    # Parser lama dari wifi-manager.py (input legacy_scan): split(':')
+    # tanpa memperhatikan escape, SSID di p[1]
+    devs, seen = [], set()
+    for line in text.splitlines():
+        p = line.split(':')
+        if len(p) >= 4 and p[1].strip() and p[1] not in seen:
+            devs.append({"active": p[0] == "yes", "ssid": p[1], "signal": int(p[3] if p[3].isdigit() else 0)})
+            seen.add(p[1])
+    return devs
+
+
+def timed(fn, arg, runs):
+    times = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        fn(arg)
+        times.append((time.perf_counter() - t) * 1e6)
+    times.sort()
+    return {"p50_us": times[len(times) // 2], "p95_us": times[int(len(times) * 0.95)]}
+
+
+# ================= CHECK =================
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name)) as f:
+        return f.read()
+
+
+def check():
+    errors = []
+    # Round-trip: unescape lalu escape ulang harus kembali ke baris yang sama
+    for name in ("nmcli-wifi-tricky.txt", "nmcli-wifi-dense.txt"):
+        for line in read_fixture(name).split("\n"):
+            if line and ":".join(escape(v) for v in split_terse(line)) != line:
+                errors.append(f"{name}: round-trip gagal: {line!r}")
+
+    tricky = parse_wifi_list(read_fixture("nmcli-wifi-tricky.txt"))
+    got = {ap["ssid"] for ap in tricky}
+    if got != set(TRICKY) | {""}:
+        errors.append(f"SSID salah: {sorted(got ^ (set(TRICKY) | {''}))!r}")
+
+    # Profil dicocokkan lewat SSID asli, bukan nama profil
+    profiles = parse_profile_ssids(read_fixture("nmcli-profile-ssids.txt"))
+    want = {
+        "Cafe:5G": "3f1c2b7e-0001-4a6d-9b1e-5a1f0c9d0001",
+        "Rumah Budi 2.4": "3f1c2b7e-0002-4a6d-9b1e-5a1f0c9d0002",
+        "trailing\\": "3f1c2b7e-0003-4a6d-9b1e-5a1f0c9d0003",
+    }
+    if profiles != want:
+        errors.append(f"profil salah: {profiles!r}")
+    rows = {n["ssid"]: n["profile"] for n in aggregate(tricky, profiles)}
+    for ssid, uuid in want.items():
+        if rows.get(ssid) != uuid:
+            errors.append(f"{ssid!r}: profile {rows.get(ssid)!r}, harusnya {uuid!r}")
+
+    for e in errors:
+        print(e)
+    print("OK" if not errors else f"{len(errors)} error")
+    return 1 if errors else 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Micro-benchmark parser nmcli terse")
+    ap.add_argument("--bssids", type=int, default=240)
+    ap.add_argument("--ssids", type=int, default=90)
+    ap.add_argument("--runs", type=int, default=500)
+    ap.add_argument("--input", help="output nmcli asli (lihat WIFI_LIST_CMD di nmcli_parse.py), "
+                                    "mis. fixtures/nmcli-wifi-dense.txt")
+    ap.add_argument("--write-fixture", help="simpan scan sintetis ke file ini lalu keluar")
+    ap.add_argument("--check", action="store_true", help="cek parser terhadap fixtures/ lalu keluar")
+    args = ap.parse_args()
+
+    if args.check:
+        sys.exit(check())
+
+    if args.input:
+        with open(args.input) as f:
+            text = f.read()
+    else:
+        text = make_scan(args.bssids, args.ssids)
+
+    if args.write_fixture:
+        with open(args.write_fixture, "w") as f:
+            f.write(text)
+        return
+
+    aps = parse_wifi_list(text)
+    nets = aggregate(aps)
+    # Round-trip: setiap baris harus punya tepat 6 field setelah di-unescape
+    malformed = sum(1 for line in text.splitlines() if line and len(split_terse(line)) != 6)
+    legacy = legacy_scan(aps)
+    naive_ssids = {a["ssid"] for a in naive_parse(legacy)}
+    real_ssids = {n["ssid"] for n in nets if n["ssid"].strip()}
+
+    result = {
+        "lines": len(text.splitlines()),
+        "bssids": len(aps),
+        "ssids": len(nets),
+        "malformed_lines": malformed,
+        # SSID hasil parser lama yang tidak ada / SSID asli yang hilang
+        "naive_wrong_ssids": len(naive_ssids - real_ssids),
+        "naive_missing_ssids": len(real_ssids - naive_ssids),
+        "parse": timed(parse_wifi_list, text, args.runs),
+        "aggregate": timed(aggregate, aps, args.runs),
+        "naive_parse": timed(naive_parse, legacy, args.runs),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,20 @@
 import sys
-import subprocess
-import threading
-import time
 from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QPushButton, 
                              QLabel, QHBoxLayout, QScrollArea, QFrame)
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject
+from PyQt6.QtCore import Qt, QTimer, QEvent
+from keyed_list import KeyedList
+from bt_backend import BluetoothSession, BackoffTimer
 
-class WorkerSignals(QObject):
-    finished = pyqtSignal(list)
+# Batas tunggu spinner awal kalau sesi tidak mengirim event apa pun
+LOAD_TIMEOUT = 1500
+
+# Property Icon BlueZ (nama icon freedesktop) -> glyph
+DEVICE_ICONS = {
+    "audio-headset": "🎧", "audio-headphones": "🎧", "audio-card": "🔊",
+    "input-mouse": "🖱", "input-keyboard": "⌨", "input-gaming": "🎮",
+    "input-tablet": "✎", "phone": "📱", "computer": "💻", "printer": "🖨",
+    "camera-photo": "📷", "camera-video": "📷",
+}
 
 class BluetoothItem(QFrame):
     def __init__(self, device, parent_gui):
@@ -18,38 +25,91 @@ class BluetoothItem(QFrame):
 
     def init_item(self, device):
         layout = QHBoxLayout(self)
-        # Warna biru terang jika aktif
-        bg = "rgba(0, 150, 255, 0.2)" if device['connected'] else "rgba(255, 255, 255, 0.05)"
-        border = "1px solid #00f2ff" if device['connected'] else "1px solid rgba(255,255,255,0.1)"
-        self.setStyleSheet(f"background-color: {bg}; border: {border}; border-radius: 12px; margin: 2px;")
+        self.connected = None
 
-        # Tampilkan nama perangkat (potong jika terlalu panjang)
-        name = device['name'] if device['name'] else "Unknown Device"
-        self.label = QLabel(name)
+        self.icon = QLabel()
+        self.icon.setFixedWidth(24)
+        self.icon.setStyleSheet("color: white; font-size: 16px; border: none; background: transparent;")
+
+        text_box = QVBoxLayout()
+        text_box.setSpacing(0)
+        self.label = QLabel()
         self.label.setStyleSheet("color: white; font-weight: bold; border: none; background: transparent;")
+        # Baterai, RSSI, paired/trusted
+        self.details = QLabel()
+        self.details.setStyleSheet("color: rgba(255,255,255,0.55); font-size: 10px; border: none; background: transparent;")
+        text_box.addWidget(self.label)
+        text_box.addWidget(self.details)
         
-        btn_text = "Disconnect" if device['connected'] else "Connect"
-        btn_style = "background: #ff5555;" if device['connected'] else "background: #0096ff;"
-        
-        self.btn = QPushButton(btn_text)
+        self.btn = QPushButton()
         self.btn.setFixedWidth(85)
-        self.btn.setStyleSheet(f"{btn_style} border: none; font-size: 10px; padding: 6px; border-radius: 6px; font-weight: bold; color: white;")
         self.btn.clicked.connect(self.main_action)
 
-        layout.addWidget(self.label)
+        layout.addWidget(self.icon)
+        layout.addLayout(text_box)
         layout.addStretch()
         layout.addWidget(self.btn)
+        self.set_data(device)
+
+    def set_data(self, device):
+        # Tampilkan nama perangkat (potong jika terlalu panjang)
+        name = device['name'] if device['name'] else "Unknown Device"
+        if self.label.text() != name:
+            self.label.setText(name)
+
+        icon = DEVICE_ICONS.get(device.get('icon') or "", "ᛒ")
+        if self.icon.text() != icon:
+            self.icon.setText(icon)
+
+        parts = []
+        if device.get('battery') is not None:
+            parts.append(f"🔋 {device['battery']}%")
+        if device.get('rssi') is not None:
+            parts.append(f"{device['rssi']} dBm")
+        if device.get('paired'):
+            parts.append("Paired")
+        if device.get('trusted'):
+            parts.append("Trusted")
+        details = " · ".join(parts)
+        if self.details.text() != details:
+            self.details.setText(details)
+            self.details.setVisible(bool(details))
+
+        # Stylesheet hanya di-set ulang kalau status koneksi berubah
+        if device['connected'] == self.connected:
+            return
+        self.connected = device['connected']
+
+        # Warna biru terang jika aktif
+        bg = "rgba(0, 150, 255, 0.2)" if self.connected else "rgba(255, 255, 255, 0.05)"
+        border = "1px solid #00f2ff" if self.connected else "1px solid rgba(255,255,255,0.1)"
+        self.setStyleSheet(f"background-color: {bg}; border: {border}; border-radius: 12px; margin: 2px;")
+
+        btn_text = "Disconnect" if self.connected else "Connect"
+        btn_style = "background: #ff5555;" if self.connected else "background: #0096ff;"
+        self.btn.setText(btn_text)
+        self.btn.setStyleSheet(f"{btn_style} border: none; font-size: 10px; padding: 6px; border-radius: 6px; font-weight: bold; color: white;")
 
     def main_action(self):
-        self.parent_gui.loading_timer.start(100)
         action = "disconnect" if "Disconnect" in self.btn.text() else "connect"
         self.parent_gui.execute_bt_cmd(action, self.mac)
 
 class GlassBT(QWidget):
     def __init__(self):
         super().__init__()
-        self.signals = WorkerSignals()
-        self.signals.finished.connect(self.populate_list)
+        # Satu sesi bluetoothctl untuk semua query; discovery berjalan terus
+        # selama window terbuka dan perangkat baru langsung masuk list
+        self.session = BluetoothSession(self)
+        self.session.changed.connect(self.populate_list)
+        self.session.state_changed.connect(self.on_state_changed)
+        self.session.action_finished.connect(self.on_action_finished)
+        self.session.error.connect(self.on_session_error)
+        self.loading = True
+
+        # Perubahan state datang lewat event sesi; rekonsiliasi periodik hanya
+        # jaring pengaman, melambat 10s -> 2 menit selama tidak ada aktivitas
+        self.refresh_timer = BackoffTimer(10000, 120000, parent=self)
+        self.refresh_timer.fire.connect(self.refresh_devices)
         
         self.loading_timer = QTimer()
         self.loading_timer.timeout.connect(self.animate_loading)
@@ -57,11 +117,6 @@ class GlassBT(QWidget):
         self.frame_idx = 0
         
         self.initUI()
-        
-        # Auto-refresh setiap 20 detik agar tidak membebani scan
-        self.refresh_timer = QTimer(self)
-        self.refresh_timer.timeout.connect(self.refresh_devices)
-        self.refresh_timer.start(20000)
 
     def initUI(self):
         self.setFixedSize(400, 550)
@@ -97,6 +152,13 @@ class GlassBT(QWidget):
         header.addWidget(close_btn)
         self.main_layout.addLayout(header)
 
+        # Pesan error sesi atau connect/disconnect, disembunyikan kalau tidak ada
+        self.status_label = QLabel()
+        self.status_label.setWordWrap(True)
+        self.status_label.setStyleSheet("color: #ff6b6b; font-size: 11px; background: transparent; padding: 0 5px;")
+        self.status_label.setVisible(False)
+        self.main_layout.addWidget(self.status_label)
+
         self.scroll = QScrollArea()
         self.scroll.setWidgetResizable(True)
         self.scroll.setStyleSheet("QScrollArea { border: none; background: transparent; }")
@@ -106,10 +168,16 @@ class GlassBT(QWidget):
         self.list_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
         self.scroll.setWidget(self.scroll_content)
         self.main_layout.addWidget(self.scroll)
+        self.rows = KeyedList(self.list_layout, lambda d: d['mac'],
+                              lambda d: BluetoothItem(d, self), "No devices found")
 
         self.setStyleSheet("QWidget { background-color: rgba(15, 15, 15, 0.95); border-radius: 20px; color: white; }")
         
-        self.refresh_devices()
+        # Spinner sampai output pertama sesi masuk, paling lama LOAD_TIMEOUT
+        # (tanpa perangkat sama sekali tidak akan ada event)
+        self.update_spinner()
+        self.session.start()
+        QTimer.singleShot(LOAD_TIMEOUT, self.finish_loading)
 
     def animate_loading(self):
         self.frame_idx = (self.frame_idx + 1) % len(self.frames)
@@ -117,70 +185,84 @@ class GlassBT(QWidget):
         self.reload_btn.setText(self.frames[self.frame_idx])
 
     def refresh_devices(self):
-        if not self.loading_timer.isActive():
+        # Cukup baca state di memori; sesi ikut merekonsiliasi lewat pipe
+        self.session.refresh()
+        if not self.loading:
+            self.populate_list()
+
+    def finish_loading(self):
+        if self.loading:
+            self.populate_list()
+
+    def on_state_changed(self):
+        # Perangkat baru/hilang atau Connected/Paired/Trusted berubah: jadwal
+        # rekonsiliasi kembali ke interval awal. Update RSSI/baterai selama
+        # scan tidak dihitung, supaya back-off dan refresh info tetap jalan
+        if self.isActiveWindow():
+            self.refresh_timer.reset()
+
+    def populate_list(self):
+        self.loading = False
+        self.update_spinner()
+        self.rows.update(self.session.sorted_devices())
+
+    def update_spinner(self):
+        # Berputar selama load awal atau masih ada connect/disconnect berjalan
+        busy = self.loading or bool(self.session.pending)
+        if busy and not self.loading_timer.isActive():
             self.loading_timer.start(100)
-        self.reload_btn.setEnabled(False)
-        threading.Thread(target=self.fetch_data, daemon=True).start()
-
-    def fetch_data(self):
-        devs = {}
-        try:
-            # Pastikan bluetooth tidak terblokir
-            subprocess.run(["rfkill", "unblock", "bluetooth"], stdout=subprocess.DEVNULL)
-            # Nyalakan power
-            subprocess.run(["bluetoothctl", "power", "on"], stdout=subprocess.DEVNULL)
-            # Scan singkat untuk memperbarui cache perangkat di sekitar
-            scan_proc = subprocess.Popen(["bluetoothctl", "scan", "on"], stdout=subprocess.DEVNULL)
-            time.sleep(1.5) # Beri waktu sejenak untuk menemukan perangkat
-            subprocess.run(["bluetoothctl", "scan", "off"], stdout=subprocess.DEVNULL)
-
-            # Ambil semua device
-            raw = subprocess.check_output(["bluetoothctl", "devices"]).decode().splitlines()
-            for line in raw:
-                p = line.split(' ', 2)
-                if len(p) >= 3:
-                    mac = p[1]
-                    name = p[2]
-                    devs[mac] = {'mac': mac, 'name': name, 'connected': False}
-
-            # Ambil device yang terkoneksi
-            conn_raw = subprocess.check_output(["bluetoothctl", "devices", "Connected"]).decode().splitlines()
-            for line in conn_raw:
-                p = line.split(' ', 2)
-                if len(p) >= 2 and p[1] in devs:
-                    devs[p[1]]['connected'] = True
-
-            sorted_list = sorted(devs.values(), key=lambda x: (x['connected'], x['name']), reverse=True)
-            self.signals.finished.emit(sorted_list)
-        except Exception as e:
-            print(f"BT Error: {e}")
-            self.signals.finished.emit([])
-
-    def populate_list(self, devices):
-        self.loading_timer.stop()
-        self.icon_label.setText("BT")
-        self.reload_btn.setText("↻")
-        self.reload_btn.setEnabled(True)
-        
-        while self.list_layout.count():
-            item = self.list_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        
-        if not devices:
-            no_dev = QLabel("No devices found")
-            no_dev.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            no_dev.setStyleSheet("color: gray; margin-top: 20px;")
-            self.list_layout.addWidget(no_dev)
-        else:
-            for d in devices:
-                self.list_layout.addWidget(BluetoothItem(d, self))
+        elif not busy and self.loading_timer.isActive():
+            self.loading_timer.stop()
+            self.icon_label.setText("BT")
+            self.reload_btn.setText("↻")
+        # Reload tetap bisa dipakai selama load awal
+        self.reload_btn.setEnabled(not self.session.pending)
 
     def execute_bt_cmd(self, action, mac):
-        # Jalankan perintah connect/disconnect
-        subprocess.Popen(["bluetoothctl", action, mac], stdout=subprocess.DEVNULL)
-        # Tunggu agak lama baru refresh agar status di sistem sudah update
-        QTimer.singleShot(4000, self.refresh_devices)
+        # Jalankan perintah connect/disconnect lewat sesi yang sama
+        self.status_label.setVisible(False)
+        row = self.rows.rows.get(mac)
+        if row: row.btn.setEnabled(False)
+        self.session.run_action(action, mac)
+        self.update_spinner()
+
+    def on_action_finished(self, mac, action, ok, message):
+        row = self.rows.rows.get(mac)
+        if row: row.btn.setEnabled(True)
+        if not ok and message != "cancelled":
+            self.status_label.setText(f"{action.capitalize()} failed: {message}")
+            self.status_label.setVisible(True)
+        self.refresh_timer.reset()
+        self.populate_list()
+
+    def on_session_error(self, message):
+        # Sesi mati: tampilkan alasannya dan berhenti menunggu output
+        self.status_label.setText(message)
+        self.status_label.setVisible(True)
+        self.populate_list()
+
+    # ---------- Jadwal refresh ----------
+    def changeEvent(self, event):
+        if event.type() == QEvent.Type.ActivationChange:
+            if self.isActiveWindow():
+                self.refresh_devices()
+                self.refresh_timer.reset()
+            else:
+                self.refresh_timer.slow()
+        super().changeEvent(event)
+
+    def showEvent(self, event):
+        self.refresh_timer.reset()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def closeEvent(self, event):
+        self.refresh_timer.stop()
+        self.session.stop()
+        super().closeEvent(event)
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
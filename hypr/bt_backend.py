@@ -0,0 +1,308 @@
+import re
+import time
+import subprocess
+from PyQt6.QtCore import QObject, QProcess, QTimer, pyqtSignal
+
+ANSI = re.compile(r"\x1b\[[0-9;]*[A-Za-z]|\x01|\x02")
+PROMPT = re.compile(r"^\[[^\]]*\][#>]\s?")
+EVENT = re.compile(r"\[(NEW|CHG|DEL)\] Device ([0-9A-F:]{17})\s?(.*)")
+DEVICE = re.compile(r"^Device ([0-9A-F:]{17})\s?(.*)")
+INFO_HEADER = re.compile(r"^\((public|random)\)$")
+FAILED = re.compile(r"^Failed to (connect|disconnect): (.*)")
+NOT_AVAILABLE = re.compile(r"^Device ([0-9A-F:]{17}) not available")
+NUMBER = re.compile(r"\((-?\d+)\)$|^(-?\d+)$")
+EMIT_DELAY = 50
+ACTION_TIMEOUT = 20000
+INFO_TTL = 30
+STATE_FIELDS = ('connected', 'paired', 'trusted')
+
+
+def clean_lines(data):
+    # Output interaktif bluetoothctl penuh warna, prompt dan '\r\x1b[K';
+    # yang tersisa hanya teks barisnya
+    lines = []
+    for raw in ANSI.sub("", data).split("\n"):
+        line = PROMPT.sub("", raw.split("\r")[-1]).rstrip()
+        if line:
+            lines.append(line)
+    return lines
+
+
+# ================= SESSION =================
+# Satu proses `bluetoothctl` interaktif selama window terbuka. Semua
+# perintah (power, scan, devices, info, connect) dikirim lewat pipe, dan
+# state perangkat dijaga dari output + event [NEW]/[CHG]/[DEL], jadi
+# refresh cukup membaca dict di memori tanpa fork proses baru.
+class BluetoothSession(QObject):
+    changed = pyqtSignal()
+    state_changed = pyqtSignal()   # perangkat baru/hilang atau status berubah, bukan RSSI/baterai
+    action_finished = pyqtSignal(str, str, bool, str)   # mac, aksi, sukses, pesan
+    error = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.proc = None
+        self.buffer = ""
+        self.devices = {}     # mac -> {mac, name, connected, paired, trusted, icon, battery, rssi}
+        self.info_mac = None  # blok `info MAC` yang sedang dibaca
+        self.info_seen = set()
+        self.info_time = {}   # mac -> waktu `info` terakhir, untuk TTL
+        self.pending = {}     # mac -> (aksi, timer timeout)
+        self.state_dirty = False
+
+        # Satu `info` menghasilkan banyak baris; cukup satu emit
+        self.emit_timer = QTimer(self)
+        self.emit_timer.setSingleShot(True)
+        self.emit_timer.setInterval(EMIT_DELAY)
+        self.emit_timer.timeout.connect(self.flush)
+
+    def start(self):
+        if self.proc is not None:
+            return
+        try:
+            # Sekali per sesi, bukan setiap refresh
+            subprocess.run(["rfkill", "unblock", "bluetooth"], stdout=subprocess.DEVNULL)
+        except OSError:
+            pass
+
+        self.proc = QProcess(self)
+        self.proc.readyReadStandardOutput.connect(self.on_output)
+        self.proc.finished.connect(self.on_finished)
+        self.proc.errorOccurred.connect(self.on_error)
+        self.proc.start("bluetoothctl", [])
+        self.send("power on")
+        self.send("devices")
+        self.send("scan on")
+
+    def stop(self):
+        for mac in list(self.pending):
+            self.finish_action(mac, False, "cancelled")
+        if self.proc is None:
+            return
+        proc, self.proc = self.proc, None
+        # Keluar karena ditutup, bukan error
+        proc.finished.disconnect()
+        proc.errorOccurred.disconnect()
+        # BlueZ juga menghentikan discovery saat client-nya keluar
+        proc.write(b"scan off\nquit\n")
+        if not proc.waitForFinished(1000):
+            proc.kill()
+            proc.waitForFinished(500)
+
+    def send(self, command):
+        if self.proc is not None:
+            self.proc.write(f"{command}\n".encode())
+
+    def refresh(self):
+        # Rekonsiliasi murah lewat pipe yang sama; hasilnya datang sebagai output.
+        # Detail (baterai, RSSI, ...) hanya diminta ulang kalau cache-nya basi
+        self.send("devices")
+        now = time.monotonic()
+        for mac in self.devices:
+            if now - self.info_time.get(mac, 0) > INFO_TTL:
+                self.request_info(mac)
+
+    def request_info(self, mac):
+        # Ditandai langsung supaya refresh berikutnya tidak mengantre `info` ganda
+        self.info_time[mac] = time.monotonic()
+        self.send(f"info {mac}")
+
+    # ---------- Connect / disconnect ----------
+    # Selesai tepat saat property Connected berubah, bukan setelah jeda tetap
+    def run_action(self, action, mac, timeout=ACTION_TIMEOUT):
+        if mac in self.pending:
+            self.finish_action(mac, False, "cancelled")
+        if self.proc is None:
+            self.action_finished.emit(mac, action, False, "bluetoothctl is not running")
+            return
+        dev = self.devices.get(mac)
+        if dev is not None and dev['connected'] == (action == "connect"):
+            self.action_finished.emit(mac, action, True, "")
+            return
+
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.timeout.connect(lambda: self.finish_action(mac, False, f"{action} timed out after {timeout / 1000:g}s"))
+        timer.start(timeout)
+        self.pending[mac] = (action, timer)
+        self.send(f"{action} {mac}")
+
+    def finish_action(self, mac, ok, message=""):
+        action, timer = self.pending.pop(mac, (None, None))
+        if action is None:
+            return
+        timer.stop()
+        timer.deleteLater()
+        self.action_finished.emit(mac, action, ok, message)
+
+    def sorted_devices(self):
+        return sorted(self.devices.values(), key=lambda x: (x['connected'], x['name']), reverse=True)
+
+    # ---------- Output ----------
+    def on_output(self):
+        if self.proc is None:
+            return
+        self.buffer += bytes(self.proc.readAllStandardOutput()).decode(errors="replace")
+        # Baris terakhir bisa saja belum lengkap
+        data, sep, self.buffer = self.buffer.rpartition("\n")
+        for line in clean_lines(data):
+            self.on_line(line)
+
+    def on_line(self, line):
+        if line.startswith("\t"):
+            if self.info_mac is not None:
+                key, _, value = line.strip().partition(": ")
+                self.info_seen.add(key)
+                self.set_property(self.info_mac, key, value)
+            return
+        self.end_info()
+
+        m = FAILED.match(line)
+        if m is not None:
+            # bluetoothctl tidak menyebut MAC; pakai aksi sejenis yang paling lama
+            action, message = m.groups()
+            for mac, (pending_action, _) in self.pending.items():
+                if pending_action == action:
+                    self.finish_action(mac, False, message)
+                    break
+            return
+
+        m = NOT_AVAILABLE.match(line)
+        if m is not None:
+            self.finish_action(m.group(1), False, "device not available")
+            return
+
+        m = EVENT.search(line)
+        if m is not None:
+            kind, mac, rest = m.groups()
+            if kind == "DEL":
+                self.info_time.pop(mac, None)
+                if self.devices.pop(mac, None) is not None:
+                    self.state_dirty = True
+                    self.schedule_emit()
+            elif kind == "NEW":
+                self.update(mac, name=rest)
+                # Status Connected/Paired belum ada di event [NEW]
+                self.request_info(mac)
+            else:
+                key, _, value = rest.partition(": ")
+                self.set_property(mac, key, value)
+            return
+
+        m = DEVICE.match(line)
+        if m is not None:
+            mac, rest = m.groups()
+            if INFO_HEADER.match(rest):
+                self.info_mac = mac
+                self.info_seen = set()
+            elif mac not in self.devices:
+                self.update(mac, name=rest)
+                self.request_info(mac)
+            else:
+                self.update(mac, name=rest)
+
+    def end_info(self):
+        # Baterai/RSSI yang tidak muncul lagi di `info` berarti sudah tidak ada
+        if self.info_mac is not None:
+            gone = {f: None for k, f in (("Battery Percentage", 'battery'), ("RSSI", 'rssi'))
+                    if k not in self.info_seen}
+            if gone:
+                self.update(self.info_mac, **gone)
+        self.info_mac = None
+
+    def set_property(self, mac, key, value):
+        if key in ("Name", "Alias"):
+            self.update(mac, name=value)
+        elif key == "Icon":
+            self.update(mac, icon=value)
+        elif key in ("Battery Percentage", "RSSI"):
+            # '0x50 (80)' di `info`, kadang hanya angka di event [CHG]
+            m = NUMBER.search(value)
+            if m is not None:
+                field = 'battery' if key.startswith("Battery") else 'rssi'
+                self.update(mac, **{field: int(m.group(1) or m.group(2))})
+        elif key in ("Connected", "Paired", "Trusted"):
+            self.update(mac, **{key.lower(): value == "yes"})
+            if key == "Connected" and mac in self.pending:
+                action = self.pending[mac][0]
+                if (value == "yes") == (action == "connect"):
+                    self.finish_action(mac, True)
+
+    def update(self, mac, **fields):
+        dev = self.devices.get(mac)
+        if dev is None:
+            dev = self.devices[mac] = {'mac': mac, 'name': mac, 'connected': False,
+                                       'paired': False, 'trusted': False,
+                                       'icon': None, 'battery': None, 'rssi': None}
+            self.state_dirty = True
+        elif all(dev.get(k) == v for k, v in fields.items()):
+            return
+        if any(k in STATE_FIELDS and dev.get(k) != v for k, v in fields.items()):
+            self.state_dirty = True
+        dev.update(fields)
+        self.schedule_emit()
+
+    def schedule_emit(self):
+        if not self.emit_timer.isActive():
+            self.emit_timer.start()
+
+    def flush(self):
+        self.changed.emit()
+        if self.state_dirty:
+            self.state_dirty = False
+            self.state_changed.emit()
+
+    def on_error(self, error):
+        # Gagal start tidak pernah diikuti 'finished'
+        if error == QProcess.ProcessError.FailedToStart:
+            self.close_session(f"bluetoothctl failed to start: {self.proc.errorString()}")
+
+    def on_finished(self, code, status):
+        if status == QProcess.ExitStatus.CrashExit:
+            self.close_session("bluetoothctl crashed")
+        else:
+            self.close_session(f"bluetoothctl exited (code {code})")
+
+    def close_session(self, message):
+        if self.proc is None:
+            return
+        self.proc.deleteLater()
+        self.proc = None
+        for mac in list(self.pending):
+            self.finish_action(mac, False, message)
+        self.error.emit(message)
+
+
+# ================= REFRESH SCHEDULER =================
+# Rekonsiliasi periodik yang melambat sendiri: mulai dari 'base', dikali
+# 'factor' setiap kali tidak ada apa-apa, sampai 'maximum'. Event penting
+# (aksi user, window aktif) mengembalikannya ke 'base'.
+class BackoffTimer(QObject):
+    fire = pyqtSignal()
+
+    def __init__(self, base, maximum, factor=2, parent=None):
+        super().__init__(parent)
+        self.base = base
+        self.maximum = maximum
+        self.factor = factor
+        self.interval = base
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.on_timeout)
+
+    def reset(self):
+        self.interval = self.base
+        self.timer.start(self.interval)
+
+    def slow(self):
+        # Window tidak aktif: langsung ke interval terpanjang
+        self.interval = self.maximum
+        self.timer.start(self.interval)
+
+    def stop(self):
+        self.timer.stop()
+
+    def on_timeout(self):
+        self.fire.emit()
+        self.interval = min(self.interval * self.factor, self.maximum)
+        self.timer.start(self.interval)
@@ -0,0 +1,159 @@
+import sys, os, time, shutil, tempfile, subprocess, importlib.util
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+from PyQt6.QtCore import QCoreApplication, QTimer
+from PyQt6.QtDBus import QDBusConnection
+from wifi_backend import DBusBackend, SCAN_TIMEOUT
+
+# Menjalankan DBusBackend terhadap fake-networkmanager.py di bus D-Bus
+# privat (dbus-daemon sementara), tanpa menyentuh NetworkManager asli.
+#   python3 check-wifi-dbus.py
+# Exit code 0 = semua cek lolos, 1 = ada yang gagal, 2 = tidak bisa jalan.
+BUS_CONFIG = """<busconfig>
+  <type>system</type>
+  <listen>unix:path={socket}</listen>
+  <auth>EXTERNAL</auth>
+  <policy context="default">
+    <allow user="*"/><allow own="*"/>
+    <allow send_destination="*"/><allow receive_sender="*"/>
+  </policy>
+</busconfig>
+"""
+
+
+# ================= HELPERS =================
+def wait_for(app, predicate, timeout):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    return predicate()
+
+
+def rows(networks):
+    return {n["ssid"]: n for n in networks}
+
+
+def start_service(env):
+    proc = subprocess.Popen([sys.executable, os.path.join(HERE, "fake-networkmanager.py")],
+                            env=env, stdout=subprocess.PIPE, text=True)
+    if proc.stdout.readline().strip() != "ready":
+        proc.wait()
+        return None
+    return proc
+
+
+# ================= SCENARIOS =================
+def scenario(app, address, name, reject=False, extra_aps=0):
+    errors = []
+
+    def check(ok, message):
+        if not ok:
+            errors.append(f"{name}: {message}")
+
+    env = dict(os.environ, DBUS_SYSTEM_BUS_ADDRESS=address)
+    if reject:
+        env["FAKE_NM_REJECT_SCAN"] = "1"
+    if extra_aps:
+        env["FAKE_NM_EXTRA_APS"] = str(extra_aps)
+    service = start_service(env)
+    if service is None:
+        return [f"{name}: fake-networkmanager.py gagal start"]
+
+    bus = QDBusConnection.connectToBus(address, name)
+    backend = DBusBackend(bus)
+    emitted, scanning = [], []
+    backend.networks.connect(emitted.append)
+    backend.scanning.connect(scanning.append)
+
+    try:
+        check(DBusBackend.available(bus), "service tidak terdeteksi di bus")
+        started = time.monotonic()
+        backend.start()
+        # start() tidak menunggu balasan D-Bus apa pun
+        check(not emitted, "start() memblok sampai daftar terbaca")
+
+        # Daftar pertama langsung dari properti, sebelum scan selesai, dan
+        # baru dikirim setelah semua balasan load lengkap
+        stalls = []
+        timer = QTimer()
+        timer.timeout.connect(lambda: stalls.append(time.monotonic()))
+        timer.start(5)
+        check(wait_for(app, lambda: emitted, 10), "tidak ada daftar sebelum scan")
+        timer.stop()
+        # Event loop tetap jalan selama ratusan balasan GetAll datang
+        gap = max((b - a for a, b in zip(stalls, stalls[1:])), default=0)
+        check(gap < 0.1, f"event loop tertahan {gap * 1000:.0f} ms saat load")
+        if extra_aps:
+            total = sum(n["bssids"] for n in emitted[0]) if emitted else 0
+            check(total == extra_aps + 3, f"daftar pertama tidak lengkap: {total} BSSID")
+        first = rows(emitted[0]) if emitted else {}
+        home, cafe = first.get("Home"), first.get("Cafe:5G")
+        check(home is not None and home["active"], "Home tidak aktif")
+        check(home is not None and home["signal"] == 85 and home["bssids"] == 2,
+              f"Home tidak diagregasi dari 2 BSSID: {home}")
+        check(home is not None and home["profile"] == "uuid-home", "profil Home tidak cocok")
+        # Profil dicocokkan lewat SSID, bukan nama ("Cafe 1")
+        check(cafe is not None and cafe["profile"] == "uuid-cafe", f"profil Cafe:5G tidak cocok: {cafe}")
+
+        # Scan selesai lewat LastScan / error, bukan SCAN_TIMEOUT
+        finished = wait_for(app, lambda: scanning and scanning[-1] is False, 3)
+        check(finished, "scanning tidak pernah selesai")
+        took = time.monotonic() - started
+        check(took < SCAN_TIMEOUT / 1000 / 2, f"scan selesai lewat timeout ({took:.1f}s)")
+
+        if reject:
+            check(len(emitted) == 1, f"scan ditolak tapi daftar berubah: {len(emitted)} emit")
+        else:
+            # Perubahan setelah scan datang sebagai signal, tanpa rescan
+            settled = wait_for(app, lambda: "Cafe:5G" not in rows(emitted[-1]), 3)
+            last = rows(emitted[-1])
+            check(settled, "AccessPointRemoved tidak diproses")
+            check("Neighbour" in last and last["Neighbour"]["active"],
+                  f"Neighbour tidak muncul/aktif: {last.get('Neighbour')}")
+            check(not last.get("Home", {}).get("active"), "Home masih aktif")
+    finally:
+        service.terminate()
+        service.wait()
+        QDBusConnection.disconnectFromBus(name)
+
+    print(f"{name}: {'OK' if not errors else 'GAGAL'} ({len(emitted)} emit)")
+    return errors
+
+
+def main():
+    if shutil.which("dbus-daemon") is None:
+        print("dbus-daemon tidak ditemukan")
+        return 2
+    if importlib.util.find_spec("dbus_next") is None:
+        print("fake-networkmanager.py butuh dbus-next: pip install dbus-next")
+        return 2
+
+    tmp = tempfile.mkdtemp(prefix="fake-nm-")
+    socket = os.path.join(tmp, "bus")
+    config = os.path.join(tmp, "bus.conf")
+    with open(config, "w") as f:
+        f.write(BUS_CONFIG.format(socket=socket))
+    daemon = subprocess.Popen(["dbus-daemon", "--nofork", "--print-address", f"--config-file={config}"],
+                              stdout=subprocess.PIPE, text=True)
+    address = daemon.stdout.readline().strip()
+
+    try:
+        app = QCoreApplication(sys.argv)
+        errors = scenario(app, address, "scan")
+        errors += scenario(app, address, "scan-ditolak", reject=True)
+        errors += scenario(app, address, "padat", reject=True, extra_aps=240)
+    finally:
+        daemon.terminate()
+        daemon.wait()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    for e in errors:
+        print(e)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
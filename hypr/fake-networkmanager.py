@@ -0,0 +1,246 @@
+import os, sys, asyncio, logging
+
+# NetworkManager palsu di bus D-Bus mana pun yang ditunjuk
+# DBUS_SYSTEM_BUS_ADDRESS, untuk menguji DBusBackend / wifi-manager.py
+# tanpa hardware Wi-Fi. Butuh dbus-next (pip install dbus-next); dijalankan
+# otomatis oleh check-wifi-dbus.py, atau manual:
+#   DBUS_SYSTEM_BUS_ADDRESS=unix:path=/tmp/bus python3 fake-networkmanager.py
+#   DBUS_SYSTEM_BUS_ADDRESS=unix:path=/tmp/bus WIFI_BACKEND=dbus python3 wifi-manager.py
+#
+# Skenario: Home (2 BSSID, aktif, profil "Home") dan Cafe:5G (profil
+# bernama "Cafe 1"). RequestScan menambah Neighbour, menaikkan LastScan,
+# lalu Cafe:5G hilang dan Neighbour jadi aktif.
+# FAKE_NM_REJECT_SCAN=1 membuat RequestScan gagal (seperti NotAllowed asli).
+# FAKE_NM_EXTRA_APS=N menambah N BSSID lain (gedung padat).
+try:
+    from dbus_next import BusType, DBusError, Variant
+    from dbus_next.aio import MessageBus
+    from dbus_next.service import ServiceInterface, method, dbus_property, signal, PropertyAccess
+except ImportError:
+    sys.exit("fake-networkmanager.py butuh dbus-next: pip install dbus-next")
+
+NM = "org.freedesktop.NetworkManager"
+NM_PATH = "/org/freedesktop/NetworkManager"
+DEVICE_PATH = NM_PATH + "/Devices/1"
+SETTINGS_PATH = NM_PATH + "/Settings"
+RSN_PSK = 0x100
+
+
+# ================= OBJECTS =================
+class AccessPoint(ServiceInterface):
+    def __init__(self, ssid, strength, bssid, freq):
+        super().__init__(NM + ".AccessPoint")
+        self.ssid = ssid.encode()
+        self.strength = strength
+        self.bssid = bssid
+        self.freq = freq
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Ssid(self) -> 'ay':
+        return self.ssid
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Strength(self) -> 'y':
+        return self.strength
+
+    @dbus_property(access=PropertyAccess.READ)
+    def HwAddress(self) -> 's':
+        return self.bssid
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Frequency(self) -> 'u':
+        return self.freq
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Flags(self) -> 'u':
+        return 1
+
+    @dbus_property(access=PropertyAccess.READ)
+    def WpaFlags(self) -> 'u':
+        return 0
+
+    @dbus_property(access=PropertyAccess.READ)
+    def RsnFlags(self) -> 'u':
+        return RSN_PSK
+
+
+class Device(ServiceInterface):
+    def __init__(self):
+        super().__init__(NM + ".Device")
+
+    @dbus_property(access=PropertyAccess.READ)
+    def DeviceType(self) -> 'u':
+        return 2
+
+
+class Wireless(ServiceInterface):
+    def __init__(self, service):
+        super().__init__(NM + ".Device.Wireless")
+        self.service = service
+        self.aps = []
+        self.active = "/"
+        self.last_scan = 0
+
+    @dbus_property(access=PropertyAccess.READ)
+    def AccessPoints(self) -> 'ao':
+        return self.aps
+
+    @dbus_property(access=PropertyAccess.READ)
+    def ActiveAccessPoint(self) -> 'o':
+        return self.active
+
+    @dbus_property(access=PropertyAccess.READ)
+    def LastScan(self) -> 'x':
+        return self.last_scan
+
+    @method()
+    def GetAllAccessPoints(self) -> 'ao':
+        return self.aps
+
+    @method()
+    def RequestScan(self, options: 'a{sv}'):
+        if os.environ.get("FAKE_NM_REJECT_SCAN"):
+            raise DBusError(NM + ".Device.NotAllowed", "Scanning not allowed immediately following previous scan")
+        asyncio.get_running_loop().call_later(0.3, lambda: asyncio.ensure_future(self.service.scan_result()))
+
+    @signal()
+    def AccessPointAdded(self, path) -> 'o':
+        return path
+
+    @signal()
+    def AccessPointRemoved(self, path) -> 'o':
+        return path
+
+
+class Manager(ServiceInterface):
+    def __init__(self):
+        super().__init__(NM)
+        self.wireless_enabled = False
+
+    @method()
+    def GetDevices(self) -> 'ao':
+        return [DEVICE_PATH]
+
+    @dbus_property()
+    def WirelessEnabled(self) -> 'b':
+        return self.wireless_enabled
+
+    @WirelessEnabled.setter
+    def WirelessEnabled(self, value: 'b'):
+        self.wireless_enabled = value
+
+    @dbus_property(access=PropertyAccess.READ)
+    def ActiveConnections(self) -> 'ao':
+        return []
+
+
+class Settings(ServiceInterface):
+    def __init__(self):
+        super().__init__(NM + ".Settings")
+        self.connections = []
+
+    @method()
+    def ListConnections(self) -> 'ao':
+        return self.connections
+
+    @signal()
+    def NewConnection(self, path) -> 'o':
+        return path
+
+    @signal()
+    def ConnectionRemoved(self, path) -> 'o':
+        return path
+
+
+class Connection(ServiceInterface):
+    def __init__(self, conn_id, uuid, ssid=None):
+        super().__init__(NM + ".Settings.Connection")
+        # Bukan self.name: atribut itu milik ServiceInterface (nama interface)
+        self.conn_id = conn_id
+        self.uuid = uuid
+        self.ssid = ssid
+
+    @method()
+    def GetSettings(self) -> 'a{sa{sv}}':
+        kind = "802-11-wireless" if self.ssid is not None else "802-3-ethernet"
+        settings = {"connection": {"id": Variant("s", self.conn_id),
+                                   "uuid": Variant("s", self.uuid),
+                                   "type": Variant("s", kind)}}
+        if self.ssid is not None:
+            settings[kind] = {"ssid": Variant("ay", self.ssid.encode()),
+                              "mode": Variant("s", "infrastructure")}
+        return settings
+
+
+# ================= SERVICE =================
+class FakeNetworkManager:
+    def __init__(self, bus):
+        self.bus = bus
+        self.wireless = Wireless(self)
+        self.settings = Settings()
+        self.count = 0
+
+    def add_ap(self, ssid, strength, freq):
+        self.count += 1
+        path = f"{NM_PATH}/AccessPoint/{self.count}"
+        bssid = f"02:00:00:00:{self.count >> 8:02X}:{self.count & 0xFF:02X}"
+        self.bus.export(path, AccessPoint(ssid, strength, bssid, freq))
+        self.wireless.aps.append(path)
+        return path
+
+    def add_connection(self, conn_id, uuid, ssid=None):
+        path = f"{SETTINGS_PATH}/{len(self.settings.connections) + 1}"
+        self.bus.export(path, Connection(conn_id, uuid, ssid))
+        self.settings.connections.append(path)
+
+    def setup(self):
+        self.bus.export(NM_PATH, Manager())
+        self.bus.export(DEVICE_PATH, Device())
+        self.bus.export(DEVICE_PATH, self.wireless)
+        self.bus.export(SETTINGS_PATH, self.settings)
+
+        self.wireless.active = self.add_ap("Home", 70, 5180)
+        self.add_ap("Home", 85, 2412)
+        self.add_ap("Cafe:5G", 40, 5240)
+        self.add_connection("Home", "uuid-home", "Home")
+        self.add_connection("Cafe 1", "uuid-cafe", "Cafe:5G")
+        self.add_connection("Wired", "uuid-eth")
+
+    async def add_extra_aps(self, count):
+        # Sesekali kembali ke event loop: dbus-next tidak menangani buffer
+        # socket penuh kalau ratusan objek diekspor sekaligus
+        for i in range(count):
+            self.add_ap(f"APT-{i // 3}", 10 + i % 60, (2412, 5180, 5955)[i % 3])
+            if i % 20 == 19:
+                await asyncio.sleep(0.01)
+
+    async def scan_result(self):
+        path = self.add_ap("Neighbour", 55, 2437)
+        self.wireless.AccessPointAdded(path)
+        await asyncio.sleep(0.05)
+        self.wireless.last_scan += 1
+        self.wireless.emit_properties_changed({"LastScan": self.wireless.last_scan})
+
+        await asyncio.sleep(0.5)
+        gone = self.wireless.aps.pop(2)
+        self.wireless.AccessPointRemoved(gone)
+        self.wireless.active = path
+        self.wireless.emit_properties_changed({"ActiveAccessPoint": path})
+
+
+async def main():
+    # dbus-next mencatat setiap DBusError sebagai traceback, termasuk yang
+    # memang sengaja dilempar (FAKE_NM_REJECT_SCAN)
+    logging.getLogger().setLevel(logging.CRITICAL)
+    bus = await MessageBus(bus_type=BusType.SYSTEM).connect()
+    nm = FakeNetworkManager(bus)
+    nm.setup()
+    await nm.add_extra_aps(int(os.environ.get("FAKE_NM_EXTRA_APS", "0")))
+    await bus.request_name(NM)
+    # Penanda untuk check-wifi-dbus.py bahwa service sudah bisa dipanggil
+    print("ready", flush=True)
+    await asyncio.Future()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QLabel
+
+
+# ================= KEYED LIST =================
+# Baris disimpan per key (SSID / MAC). Refresh hanya menambah, menghapus
+# atau meng-update baris yang berubah; widget yang sudah ada tetap hidup,
+# jadi password yang sedang diketik tidak hilang dan stylesheet tidak
+# di-polish ulang setiap refresh.
+class KeyedList:
+    def __init__(self, layout, key, create, empty_text=None):
+        self.layout = layout
+        self.key = key
+        self.create = create
+        self.empty_text = empty_text
+        self.rows = {}
+        self.placeholder = None
+
+    def update(self, items):
+        keys = [self.key(item) for item in items]
+        wanted = set(keys)
+
+        for k in [k for k in self.rows if k not in wanted]:
+            w = self.rows.pop(k)
+            self.layout.removeWidget(w)
+            w.deleteLater()
+
+        for i, (k, item) in enumerate(zip(keys, items)):
+            w = self.rows.get(k)
+            if w is None:
+                w = self.rows[k] = self.create(item)
+                self.layout.insertWidget(i, w)
+                continue
+            w.set_data(item)
+            # Pindahkan hanya kalau urutannya berubah (mis. sinyal naik)
+            if self.layout.indexOf(w) != i:
+                self.layout.removeWidget(w)
+                self.layout.insertWidget(i, w)
+
+        self.update_placeholder(not items)
+
+    def update_placeholder(self, empty):
+        if self.empty_text is None:
+            return
+        if self.placeholder is None:
+            if not empty:
+                return
+            # Selalu di posisi terakhir, di belakang semua baris
+            self.placeholder = QLabel(self.empty_text)
+            self.placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.placeholder.setStyleSheet("color: gray; margin-top: 20px;")
+            self.layout.addWidget(self.placeholder)
+        self.placeholder.setVisible(empty)
@@ -0,0 +1,130 @@
+# Field yang diminta dari `nmcli -t device wifi list`. Mode terse meng-escape
+# ':' jadi '\:' dan '\' jadi '\\', jadi SSID/BSSID boleh berisi ':'.
+WIFI_FIELDS = "IN-USE,BSSID,SSID,FREQ,SIGNAL,SECURITY"
+CONNECTION_FIELDS = "NAME,UUID,TYPE"
+WIFI_LIST_CMD = ["nmcli", "-t", "--escape", "yes", "-f", WIFI_FIELDS, "device", "wifi", "list"]
+CONNECTION_CMD = ["nmcli", "-t", "--escape", "yes", "-f", CONNECTION_FIELDS, "connection", "show"]
+PROFILE_SSID_FIELDS = "connection.uuid,802-11-wireless.ssid"
+
+# Escape diganti sentinel dulu supaya split(':') biasa (di C) bisa dipakai;
+# nmcli tidak menulis karakter kontrol ini, jadi aman sebagai penanda.
+# Baris dipecah dengan split("\n"), bukan splitlines(), karena SSID boleh
+# berisi U+2028 / \x85
+_BACKSLASH, _COLON = "\x00", "\x01"
+
+
+# ================= TERSE FIELDS =================
+def _protect(text):
+    return text.replace("\\\\", _BACKSLASH).replace("\\:", _COLON)
+
+
+def _restore(value):
+    if _BACKSLASH in value or _COLON in value:
+        return value.replace(_COLON, ":").replace(_BACKSLASH, "\\")
+    return value
+
+
+def split_terse(line):
+    return [_restore(v) for v in _protect(line).split(":")]
+
+
+def band_of(freq):
+    if freq >= 5925:
+        return "6"
+    if freq >= 4900:
+        return "5"
+    return "2.4"
+
+
+# ================= PARSERS =================
+def parse_wifi_list(text):
+    aps = []
+    # Escape diproses sekali untuk seluruh output, bukan per baris
+    for line in _protect(text).split("\n"):
+        p = line.split(":")
+        if len(p) < 6:
+            continue
+        freq = p[3].split(" ", 1)[0]
+        aps.append({
+            "active": p[0] == "*",
+            "bssid": _restore(p[1]),
+            "ssid": _restore(p[2]),
+            "freq": int(freq) if freq.isdigit() else 0,
+            "signal": int(p[4]) if p[4].isdigit() else 0,
+            # nmcli menulis '--' untuk jaringan terbuka
+            "security": "" if p[5] == "--" else p[5],
+        })
+    return aps
+
+
+def profile_ssid_cmd(uuids):
+    # Detail beberapa profil sekaligus dalam satu panggilan nmcli
+    cmd = ["nmcli", "-t", "--escape", "yes", "-f", PROFILE_SSID_FIELDS, "connection", "show"]
+    for uuid in uuids:
+        cmd += ["uuid", uuid]
+    return cmd
+
+
+def parse_connections(text):
+    # Profil Wi-Fi tersimpan: nama -> UUID. Nama belum tentu sama dengan
+    # SSID ("Cafe 1", profil yang di-rename); SSID aslinya diambil lewat
+    # profile_ssid_cmd, nama hanya dipakai kalau itu gagal
+    profiles = {}
+    for line in _protect(text).split("\n"):
+        p = line.split(":")
+        if len(p) >= 3 and p[2] == "802-11-wireless":
+            profiles[_restore(p[0])] = p[1]
+    return profiles
+
+
+def parse_profile_ssids(text):
+    # Output `connection show uuid A uuid B`: baris 'field:nilai' per profil,
+    # setiap blok diawali connection.uuid. Hasil: SSID -> UUID
+    ssids = {}
+    uuid = None
+    for line in _protect(text).split("\n"):
+        key, _, value = line.partition(":")
+        if key == "connection.uuid":
+            uuid = _restore(value)
+        elif key == "802-11-wireless.ssid" and uuid and value:
+            # Beberapa profil untuk SSID yang sama: yang pertama dipakai
+            ssids.setdefault(_restore(value), uuid)
+    return ssids
+
+
+# ================= AGGREGATE =================
+def aggregate(aps, profiles=None):
+    # Satu baris per SSID: info dari BSSID terkuat, aktif kalau salah satu
+    # BSSID-nya aktif. 'profile' = UUID profil tersimpan (None kalau belum ada)
+    profiles = profiles or {}
+    best = {}
+    for ap in aps:
+        ssid = ap["ssid"]
+        if not ssid.strip():
+            continue
+        band = band_of(ap.get("freq", 0)) if ap.get("freq") else None
+        cur = best.get(ssid)
+        if cur is None:
+            best[ssid] = {
+                "active": ap["active"],
+                "ssid": ssid,
+                "signal": ap["signal"],
+                "security": ap.get("security", ""),
+                "bands": [band] if band else [],
+                "bssids": 1,
+                "profile": profiles.get(ssid),
+            }
+            continue
+        cur["active"] = cur["active"] or ap["active"]
+        cur["bssids"] += 1
+        if band and band not in cur["bands"]:
+            cur["bands"].append(band)
+        if ap["signal"] > cur["signal"]:
+            cur["signal"] = ap["signal"]
+            cur["security"] = ap.get("security", "")
+
+    devs = list(best.values())
+    for d in devs:
+        d["bands"].sort(key=float)
+    devs.sort(key=lambda x: (x['active'], x['signal']), reverse=True)
+    return devs
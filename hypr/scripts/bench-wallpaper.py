@@ -0,0 +1,233 @@
+import sys, os, json, time, random, shutil, tempfile, argparse, resource, importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+# Headless: jalan tanpa compositor
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QImage, QColor, QPainter, QLinearGradient, QKeyEvent
+from PyQt6.QtCore import Qt, QEvent, QPointF
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+
+def load_chooser():
+    # Nama file pakai '-', jadi tidak bisa di-import biasa
+    spec = importlib.util.spec_from_file_location(
+        "choose_wallpaper", os.path.join(HERE, "choose-wallpaper.py"))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+# ================= SYNTHETIC IMAGES =================
+def make_image(path, width, height, seed):
+    rnd = random.Random(seed)
+    img = QImage(width, height, QImage.Format.Format_RGB32)
+
+    grad = QLinearGradient(QPointF(0, 0), QPointF(width, height))
+    for stop in (0.0, 0.5, 1.0):
+        grad.setColorAt(stop, QColor(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)))
+
+    p = QPainter(img)
+    p.fillRect(img.rect(), grad)
+    # Detail acak supaya ukuran file/encoder mendekati foto asli
+    for _ in range(200):
+        p.setPen(QColor(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)))
+        p.drawLine(rnd.randrange(width), rnd.randrange(height),
+                   rnd.randrange(width), rnd.randrange(height))
+    p.end()
+    img.save(path)
+    return path
+
+
+def make_image_set(root, count, width, height, fmt):
+    os.makedirs(root, exist_ok=True)
+    paths = [os.path.join(root, f"synthetic-{i:05d}.{fmt}") for i in range(count)]
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+        list(ex.map(lambda a: make_image(a[1], width, height, a[0]), enumerate(paths)))
+    return paths
+
+
+# ================= MEASUREMENTS =================
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def wait_until(app, cond, timeout=30.0):
+    end = time.perf_counter() + timeout
+    while not cond():
+        if time.perf_counter() > end:
+            return False
+        app.processEvents()
+        time.sleep(0.001)
+    return True
+
+
+def center_ready(w):
+    path = w._wanted.get(1)
+    return path is not None and path in w.cache
+
+
+def decode_latency(decode, paths, size, samples):
+    times = []
+    for path in paths[:samples]:
+        t = time.perf_counter()
+        decode(path, size)
+        times.append((time.perf_counter() - t) * 1000)
+    return {
+        "samples": len(times),
+        "p50_ms": percentile(times, 50),
+        "p95_ms": percentile(times, 95),
+    }
+
+
+def first_frame(app, cw, root):
+    t = time.perf_counter()
+    # Tanpa build metadata: decode-nya berebut CPU dengan preview dan
+    # membuat angka tidak sebanding dengan run sebelum index metadata ada
+    w = cw.NobaraCarousel(index=cw.WallpaperIndex(root), build_metadata=False)
+    w.show()
+    ok = wait_until(app, lambda: center_ready(w))
+    w.repaint()
+    ms = (time.perf_counter() - t) * 1000
+    return w, (ms if ok else None)
+
+
+def press_right(app, w):
+    app.sendEvent(w, QKeyEvent(QEvent.Type.KeyPress, Qt.Key.Key_Right,
+                               Qt.KeyboardModifier.NoModifier))
+
+
+def held_key(app, w, steps, repeat_hz, warmup=3, timeout=60.0):
+    # Panah kanan ditahan: tekanan datang tiap 1/repeat_hz detik tanpa
+    # menunggu animasi selesai. Per tekanan diukur waktu sampai pixmap
+    # gambar tengahnya ada di cache (gambar yang sudah dilewati sebelum
+    # siap dihitung 'skipped'), dan frame yang menggambar placeholder di
+    # tengah dihitung. Semuanya naik begitu decode/cache melambat, tidak
+    # tertutup durasi animasi
+    for _ in range(warmup):
+        press_right(app, w)
+        wait_until(app, lambda: not w.animating and center_ready(w))
+
+    frames = {"painted": 0, "placeholder": 0}
+    rounded = w.rounded
+
+    def counting(path, center):
+        pixmap = rounded(path, center)
+        if center:
+            frames["painted"] += 1
+            frames["placeholder"] += pixmap is None
+        return pixmap
+
+    w.rounded = counting
+    interval = 1.0 / repeat_hz
+    target = None   # (path, waktu tekan) gambar tengah yang belum siap
+    latencies = []
+    skipped = pressed = 0
+    next_press = time.perf_counter()
+    end = next_press + timeout
+    while (pressed < steps or target) and time.perf_counter() < end:
+        if pressed < steps and time.perf_counter() >= next_press:
+            skipped += target is not None
+            t = time.perf_counter()
+            press_right(app, w)
+            target = (w.images[w.current_index], t)
+            pressed += 1
+            next_press += interval
+        app.processEvents()
+        if target and target[0] in w.cache:
+            latencies.append((time.perf_counter() - target[1]) * 1000)
+            target = None
+        time.sleep(0.001)
+    wait_until(app, lambda: not w.animating)
+    del w.rounded
+
+    return {
+        "repeat_hz": repeat_hz,
+        "steps": pressed,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "skipped": skipped,
+        "never_ready": int(target is not None),
+        "frames": frames["painted"],
+        "placeholder_frames": frames["placeholder"],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark choose-wallpaper.py (headless)")
+    ap.add_argument("--count", type=int, default=100)
+    ap.add_argument("--width", type=int, default=3840)
+    ap.add_argument("--height", type=int, default=2160)
+    ap.add_argument("--format", default="jpg", choices=["jpg", "png", "webp"])
+    ap.add_argument("--steps", type=int, default=30, help="jumlah langkah panah kanan")
+    ap.add_argument("--repeat-hz", type=float, default=25,
+                    help="kecepatan key repeat saat panah ditahan (default Hyprland: 25)")
+    ap.add_argument("--decode-samples", type=int, default=30)
+    ap.add_argument("--images", help="pakai folder ini, bukan gambar sintetis")
+    ap.add_argument("--output", help="tulis JSON ke file (default: stdout)")
+    ap.add_argument("--keep", action="store_true", help="jangan hapus folder kerja sementara")
+    args = ap.parse_args()
+
+    work = tempfile.mkdtemp(prefix="bench-wallpaper-")
+    # Cache thumbnail/index terpisah dari milik user, dan selalu mulai dingin
+    os.environ["XDG_CACHE_HOME"] = os.path.join(work, "cache")
+
+    app = QApplication(sys.argv)
+    # Import setelah XDG_CACHE_HOME di-set, CACHE_DIR dihitung saat import
+    cw = load_chooser()
+    from wallpaper_cache import decode_scaled
+
+    t = time.perf_counter()
+    if args.images:
+        root = os.path.abspath(args.images)
+        idx = cw.WallpaperIndex(root)
+        idx.refresh()
+        paths = idx.images()
+    else:
+        root = os.path.join(work, "wallpapers")
+        paths = make_image_set(root, args.count, args.width, args.height, args.format)
+    generate_s = time.perf_counter() - t
+
+    result = {
+        "images": len(paths),
+        "resolution": f"{args.width}x{args.height}" if not args.images else None,
+        "format": args.format if not args.images else None,
+        "generate_s": generate_s,
+        "decode": decode_latency(decode_scaled, paths, cw.LOAD_SIZE, args.decode_samples),
+    }
+
+    # Run pertama: cache disk kosong. Run kedua: proses "baru" tapi
+    # thumbnail + index sudah ada di disk.
+    w, result["first_frame_cold_ms"] = first_frame(app, cw, root)
+    result["navigation"] = held_key(app, w, args.steps, args.repeat_hz)
+    result["cache"] = w.cache.stats()
+    w.close()
+    w.pool.waitForDone()
+
+    w2, result["first_frame_warm_ms"] = first_frame(app, cw, root)
+    w2.close()
+    w2.pool.waitForDone()
+
+    result["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if args.keep:
+        result["workdir"] = work
+    else:
+        shutil.rmtree(work, ignore_errors=True)
+
+    out = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(out + "\n")
+    else:
+        print(out)
+
+
+if __name__ == "__main__":
+    main()
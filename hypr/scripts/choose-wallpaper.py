@@ -1,58 +1,144 @@
-import sys, os, subprocess
+import sys, os, json, math, subprocess, threading
 from PyQt6.QtWidgets import (
-    QApplication, QWidget, QHBoxLayout, QLabel,
-    QVBoxLayout, QGraphicsOpacityEffect
+    QApplication, QWidget, QLabel, QVBoxLayout
 )
 from PyQt6.QtGui import (
     QPixmap, QImage, QColor, QPainter, QPainterPath
 )
 from PyQt6.QtCore import (
-    Qt, QSize, QPropertyAnimation,
-    QParallelAnimationGroup, QThread, pyqtSignal
+    Qt, QSize, QRectF, QVariantAnimation, QAbstractAnimation, QEasingCurve,
+    QCoreApplication, QObject, QRunnable, QThreadPool, QProcess, pyqtSignal
 )
+from wallpaper_cache import ThumbnailCache, PixmapCache
+from wallpaper_index import WallpaperIndex, MetadataIndex
+from wallpaper_variants import load_sources, source_of
+
+HERE = os.path.dirname(os.path.abspath(__file__))
 
 # ================= THREAD IMAGE LOADER =================
-class ImageLoader(QThread):
-    loaded = pyqtSignal(int, QImage, str, int)
+class LoaderSignals(QObject):
+    loaded = pyqtSignal(QImage, str)
+    done = pyqtSignal(int)
+
+
+class IndexSignals(QObject):
+    refreshed = pyqtSignal(list)
+    metadata_ready = pyqtSignal()
 
-    def __init__(self, index, path, size):
+
+class ImageLoader(QRunnable):
+    def __init__(self, path, size, thumbs, priority=0):
         super().__init__()
-        self.index = index
+        self.signals = LoaderSignals()
         self.path = path
         self.size = size
+        self.thumbs = thumbs
+        self.priority = priority
+        self.cancelled = False
+        # Umur objek diatur carousel (sampai sinyal done), bukan pool,
+        # supaya tryTake tidak pernah menyentuh runnable yang sudah dihapus
+        self.setAutoDelete(False)
 
     def run(self):
-        img = QImage(self.path)
-        if img.isNull():
-            return
+        try:
+            # Gambar sudah tidak dibutuhkan sebelum sempat di-decode
+            if self.cancelled:
+                return
 
-        scaled = img.scaled(
-            self.size,
-            Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-            Qt.TransformationMode.SmoothTransformation
-        )
-        self.loaded.emit(self.index, scaled, self.path, self.size.width())
+            scaled = self.thumbs.get(self.path, self.size)
+            if scaled is None or self.cancelled:
+                return
+
+            self.signals.loaded.emit(scaled, self.path)
+        finally:
+            self.signals.done.emit(id(self))
 
 
 # ================= ROUNDED IMAGE =================
-class RoundedImage(QLabel):
-    def __init__(self, radius=20, parent=None):
-        super().__init__(parent)
+def render_rounded(pixmap, size, radius, border_color, dpr=1.0):
+    # Sudut bulat + border di-bake sekali ke pixmap; repaint tinggal blit
+    out = QPixmap(size * dpr)
+    out.setDevicePixelRatio(dpr)
+    out.fill(Qt.GlobalColor.transparent)
+
+    p = QPainter(out)
+    p.setRenderHints(
+        QPainter.RenderHint.Antialiasing |
+        QPainter.RenderHint.SmoothPixmapTransform
+    )
+
+    rect = QRectF(0, 0, size.width(), size.height())
+    path = QPainterPath()
+    path.addRoundedRect(rect, radius, radius)
+
+    p.setClipPath(path)
+    p.drawPixmap(rect.toRect(), pixmap)
+
+    p.setClipping(False)
+    p.setPen(border_color)
+    p.drawRoundedRect(rect.adjusted(0, 0, -1, -1), radius, radius)
+    p.end()
+    return out
+
+
+# ================= CAROUSEL CANVAS =================
+SLOT_SIZES = [QSize(380, 210), QSize(480, 270), QSize(380, 210)]
+SLOT_GAP = 30
+SLIDE_MS = 180
+MAX_SLIDE = 3  # jarak geser maksimum saat panah ditahan
+
+
+# Satu widget yang menggambar semua slot dengan QPainter (opacity +
+# posisi), tanpa QGraphicsOpacityEffect per slot
+class CarouselCanvas(QWidget):
+    def __init__(self, carousel, radius=20):
+        super().__init__(carousel)
+        self.carousel = carousel
         self.radius = radius
-        self.border_color = QColor(255, 255, 255, 40)
-        self._pixmap = None
+        self.offset = 0.0
+        self.setFixedHeight(SLOT_SIZES[1].height())
+
+        self.anim = QVariantAnimation(self)
+        self.anim.setEasingCurve(QEasingCurve.Type.OutCubic)
+        self.anim.valueChanged.connect(self.on_offset)
+
+    def is_animating(self):
+        return self.anim.state() == QAbstractAnimation.State.Running
+
+    def slide(self, steps):
+        # Lanjut dari posisi visual sekarang: tekanan panah selama animasi
+        # digabung jadi satu geseran multi-langkah, bukan dibuang
+        start = max(-MAX_SLIDE, min(MAX_SLIDE, self.offset + steps))
+        self.anim.stop()
+        self.anim.setDuration(SLIDE_MS)
+        self.anim.setStartValue(float(start))
+        self.anim.setEndValue(0.0)
+        self.anim.start()
+
+    def on_offset(self, value):
+        self.offset = value
+        self.update()
 
-        eff = QGraphicsOpacityEffect(self)
-        eff.setOpacity(1.0)
-        self.setGraphicsEffect(eff)
+    def slot_rect(self, v):
+        # v = posisi visual relatif ke tengah (0 tengah, +-1 samping)
+        center, side = SLOT_SIZES[1], SLOT_SIZES[0]
+        a = min(abs(v), 1.0)
+        w = center.width() + (side.width() - center.width()) * a
+        h = center.height() + (side.height() - center.height()) * a
 
-    def set_image(self, pixmap, border_hex):
-        self.border_color = QColor(border_hex)
-        self._pixmap = pixmap
-        self.update()
+        step = center.width() / 2 + SLOT_GAP + side.width() / 2
+        if abs(v) <= 1:
+            dist = abs(v) * step
+        else:
+            dist = step + (abs(v) - 1) * (side.width() + SLOT_GAP)
+
+        cx = self.width() / 2 + math.copysign(dist, v)
+        cy = self.height() / 2
+        return QRectF(cx - w / 2, cy - h / 2, w, h)
 
     def paintEvent(self, event):
-        if not self._pixmap:
+        c = self.carousel
+        if not c.images:
             return
 
         p = QPainter(self)
@@ -61,49 +147,186 @@ class RoundedImage(QLabel):
             QPainter.RenderHint.SmoothPixmapTransform
         )
 
-        rect = self.rect().toRectF()
-        path = QPainterPath()
-        path.addRoundedRect(rect, self.radius, self.radius)
-
-        p.setClipPath(path)
-        p.drawPixmap(self.rect(), self._pixmap)
+        total = len(c.images)
+        reach = 2 + math.ceil(abs(self.offset))
+        # Yang jauh digambar dulu, slot tengah paling atas
+        for k in sorted(range(-reach, reach + 1), key=lambda k: -abs(k + self.offset)):
+            v = k + self.offset
+            if abs(v) >= 2:
+                continue
 
-        p.setClipping(False)
-        p.setPen(self.border_color)
-        p.drawRoundedRect(rect.adjusted(0, 0, -1, -1),
-                          self.radius, self.radius)
+            rect = self.slot_rect(v)
+            p.setOpacity(1.0 if abs(v) <= 1 else 2 - abs(v))
+
+            path = c.images[(c.current_index + k) % total]
+            pixmap = c.rounded(path, abs(v) < 0.5)
+            if pixmap is None:
+                p.setPen(Qt.PenStyle.NoPen)
+                p.setBrush(QColor(255, 255, 255, 15))
+                p.drawRoundedRect(rect, self.radius, self.radius)
+            else:
+                # Saat diam ukuran rect == ukuran pixmap, jadi ini blit biasa
+                p.drawPixmap(rect, pixmap, QRectF(pixmap.rect()))
+
+
+# ================= SWWW =================
+def parse_swww_query(text):
+    # Satu baris per output, contoh:
+    #   eDP-1: 1920x1080, scale: 1, currently displaying: image: /path/a.jpg
+    # (swww versi baru menambahkan ": " di depan nama output)
+    active = {}
+    for line in text.splitlines():
+        line = line.strip().lstrip(":").strip()
+        if "image:" not in line:
+            continue
+        output = line.split(":", 1)[0].strip()
+        active[output] = line.split("image:", 1)[1].strip()
+    return active
 
 
 # ================= MAIN UI =================
+# Semua gambar di-decode sekali di ukuran tengah; slot samping
+# menggambar pixmap yang sama dengan skala lebih kecil
+LOAD_SIZE = SLOT_SIZES[1]
+# Batas memori cache pixmap, bisa diatur: CHOOSE_WALLPAPER_CACHE_MB=128
+CACHE_BUDGET = int(os.environ.get("CHOOSE_WALLPAPER_CACHE_MB", "64")) * 1024 * 1024
+
+VISIBLE_PRIORITY = 1
+PREFETCH_PRIORITY = -1
+PREFETCH_AHEAD = 4
+PREFETCH_BUDGET = 16 * 1024 * 1024  # byte pixmap hasil prefetch
+
+
 class NobaraCarousel(QWidget):
-    def __init__(self):
+    def __init__(self, thumbs=None, cache_bytes=CACHE_BUDGET, index=None, build_metadata=True):
         super().__init__()
 
-        wp = os.path.expanduser("~/Pictures/wallpapers/")
-        self.base_path = wp if os.path.exists(wp) else os.path.expanduser("~/Pictures")
+        # Buka langsung dengan daftar dari sesi sebelumnya; perubahan
+        # folder direkonsiliasi di background
+        self.index = index or WallpaperIndex()
+        self.base_path = self.index.root
+        self.meta = MetadataIndex()
+        self.build_metadata = build_metadata
+        self.query = ""
+        self.fit_screen = False
+        self.current_index = 0
+        self.all_images = self.index.load()
+        self.set_images(self.all_images)
+
+        self.thumbs = thumbs or ThumbnailCache()
+        self.cache = PixmapCache(cache_bytes)
+
+        # Jumlah thread decode tetap, berapapun cepatnya panah ditekan
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, min(4, os.cpu_count() or 2)))
+        self._workers = {}
+        self._inflight = {}
+        self._wanted = {}
+        self._prefetch = []
+
+        self.direction = 1
+        self.active_by_output = {}
+        self._user_moved = False
 
-        valid = ('.png', '.jpg', '.jpeg', '.webp')
-        self.images = sorted(
-            os.path.join(self.base_path, f)
-            for f in os.listdir(self.base_path)
-            if f.lower().endswith(valid)
-        )
+        self.initUI()
+        self.update_display()
 
-        self.cache = {}
-        self._workers = set()
-        self.animating = False
-        self.current_index = self.get_active_wallpaper_index()
+        # swww query jalan async; carousel lompat ke wallpaper aktif
+        # begitu hasilnya datang (kecuali user sudah mulai scroll)
+        self.swww_query = QProcess(self)
+        self.swww_query.finished.connect(self.on_swww_query)
+        self.swww_query.start("swww", ["query"])
+
+        self.index_signals = IndexSignals()
+        self.index_signals.refreshed.connect(self.on_index_refreshed)
+        self.index_signals.metadata_ready.connect(self.on_metadata_ready)
+        self.index_stop = threading.Event()
+        threading.Thread(target=self.refresh_index, daemon=True).start()
+
+    def set_images(self, images):
+        self.images = images
+        self.path_index = {p: i for i, p in enumerate(images)}
+
+    def refresh_index(self):
+        if self.index.refresh() and not self.index_stop.is_set():
+            self.index_signals.refreshed.emit(self.index.images())
+        if not self.build_metadata:
+            return
 
-        self.initUI()
+        # Metadata (dimensi, warna, phash) dibangun pelan-pelan di thread
+        # ini dengan koneksi SQLite sendiri; berhenti begitu window ditutup
+        meta = MetadataIndex()
+        if meta.update(self.index.images(), stop=self.index_stop) and not self.index_stop.is_set():
+            self.index_signals.metadata_ready.emit()
+        meta.close()
+
+    def on_index_refreshed(self, images):
+        self.all_images = images
+        self.apply_filter()
+
+    def on_metadata_ready(self):
+        if self.fit_screen:
+            self.apply_filter()
+        else:
+            self.update_label()
+
+    # ================= FILTER =================
+    def apply_filter(self):
+        current = self.images[self.current_index] if self.images else None
+
+        matches = None
+        if self.query:
+            matches = self.meta.search(self.query)
+        if self.fit_screen:
+            screen = self.screen()
+            size = screen.size() * screen.devicePixelRatio()
+            fit = self.meta.fitting(size.width(), size.height())
+            matches = fit if matches is None else matches & fit
+
+        if matches is None:
+            self.set_images(self.all_images)
+        else:
+            self.set_images([p for p in self.all_images if p in matches])
+
+        idx = self.path_index.get(current)
+        if idx is None:
+            idx = self.active_wallpaper_index()
+        if idx is None:
+            idx = min(self.current_index, max(len(self.images) - 1, 0))
+        self.current_index = idx
         self.update_display()
 
-    def get_active_wallpaper_index(self):
-        try:
-            res = subprocess.check_output(["swww", "query"], text=True)
-            path = res.split("image:")[-1].strip()
-            return self.images.index(path) if path in self.images else 0
-        except Exception:
-            return 0
+    # ================= ACTIVE WALLPAPER =================
+    def on_swww_query(self):
+        out = bytes(self.swww_query.readAllStandardOutput()).decode(errors="replace")
+        # Kalau wallpaper di-apply lewat variant per-monitor, swww melaporkan
+        # path variant di cache; kembalikan ke file aslinya
+        sources = load_sources()
+        self.active_by_output = {
+            output: source_of(path, sources)
+            for output, path in parse_swww_query(out).items()
+        }
+
+        idx = self.active_wallpaper_index()
+        if idx is not None and not self._user_moved and idx != self.current_index:
+            self.current_index = idx
+            self.update_display()
+
+    def active_wallpaper_index(self):
+        if not self.active_by_output:
+            return None
+
+        # Utamakan monitor tempat window ini muncul
+        screen = self.screen().name() if self.screen() else None
+        paths = list(self.active_by_output.values())
+        if screen in self.active_by_output:
+            paths.insert(0, self.active_by_output[screen])
+
+        for path in paths:
+            idx = self.path_index.get(os.path.abspath(path))
+            if idx is not None:
+                return idx
+        return None
 
     def initUI(self):
         # --- UPDATE IDENTITAS WINDOW ---
@@ -121,15 +344,7 @@ class NobaraCarousel(QWidget):
         main.setContentsMargins(0, 100, 0, 0)
         main.setSpacing(20)
 
-        row = QHBoxLayout()
-        row.setSpacing(30)
-
-        self.sizes = [QSize(380, 210), QSize(480, 270), QSize(380, 210)]
-        self.slots = [RoundedImage() for _ in range(3)]
-
-        for s, size in zip(self.slots, self.sizes):
-            s.setFixedSize(size)
-            row.addWidget(s, alignment=Qt.AlignmentFlag.AlignCenter)
+        self.canvas = CarouselCanvas(self)
 
         self.name_label = QLabel(alignment=Qt.AlignmentFlag.AlignCenter)
         self.name_label.setStyleSheet(
@@ -138,95 +353,202 @@ class NobaraCarousel(QWidget):
             "font-family: 'JetBrains Mono';"
         )
 
-        main.addLayout(row)
+        main.addWidget(self.canvas)
         main.addWidget(self.name_label)
 
     # ================= UPDATE DISPLAY =================
+    def update_label(self):
+        text = ""
+        if self.images:
+            path = self.images[self.current_index]
+            text = os.path.basename(path)
+            info = self.meta.get(path)
+            if info:
+                text += f"  ·  {info['width']}x{info['height']}"
+
+        filters = []
+        if self.query:
+            filters.append(f"🔍 {self.query}")
+        if self.fit_screen:
+            filters.append("fit")
+        if filters:
+            text = f"[{' | '.join(filters)}]  {text or 'tidak ada hasil'}"
+        self.name_label.setText(text)
+
     def update_display(self):
+        self.update_label()
+        self.canvas.update()
         if not self.images:
             return
 
         total = len(self.images)
         indices = [(self.current_index + i) % total for i in (-1, 0, 1)]
-        self.name_label.setText(os.path.basename(self.images[self.current_index]))
 
         for slot_idx, img_idx in enumerate(indices):
             path = self.images[img_idx]
-            size = self.sizes[slot_idx]
-            border = "#ffffff" if slot_idx == 1 else "#444444"
-            key = (path, size.width())
+            self._wanted[slot_idx] = path
 
-            if key in self.cache:
-                self.slots[slot_idx].set_image(self.cache[key], border)
-                continue
-
-            worker = ImageLoader(slot_idx, path, size)
-            self._workers.add(worker)
-
-            worker.loaded.connect(self.on_image_loaded)
-            worker.finished.connect(lambda w=worker: self._workers.discard(w))
-            worker.finished.connect(worker.deleteLater)
-            worker.start()
+            if self.cache.get(path) is None:
+                self.request(path, VISIBLE_PRIORITY)
 
-    def on_image_loaded(self, slot_idx, image, path, width):
-        pixmap = QPixmap.fromImage(image)
-        self.cache[(path, width)] = pixmap
+        self.prefetch()
 
-        border = "#ffffff" if slot_idx == 1 else "#444444"
-        self.slots[slot_idx].set_image(pixmap, border)
+    # ================= LOADING =================
+    def request(self, path, priority):
+        worker = self._inflight.get(path)
 
-        if len(self.cache) > 40:
-            for _ in range(10):
-                self.cache.pop(next(iter(self.cache)))
-
-    # ================= ANIMATION =================
-    def run_fade(self, direction):
-        if self.animating:
+        if worker is not None:
+            # Sudah antri sebagai prefetch tapi sekarang terlihat: naikkan prioritas
+            if priority > worker.priority and self.pool.tryTake(worker):
+                worker.priority = priority
+                self.pool.start(worker, priority)
             return
-        self.animating = True
-
-        out = QParallelAnimationGroup(self)
-        for s in self.slots:
-            a = QPropertyAnimation(s.graphicsEffect(), b"opacity")
-            a.setDuration(120)
-            a.setEndValue(0.2)
-            out.addAnimation(a)
 
-        def swap():
-            self.current_index = (self.current_index + direction) % len(self.images)
-            self.update_display()
+        worker = ImageLoader(path, LOAD_SIZE, self.thumbs, priority)
+        worker.signals.loaded.connect(self.on_image_loaded)
+        worker.signals.done.connect(self.on_worker_done)
+        self._workers[id(worker)] = worker
+        self._inflight[path] = worker
+        self.pool.start(worker, priority)
 
-            inn = QParallelAnimationGroup(self)
-            for s in self.slots:
-                a = QPropertyAnimation(s.graphicsEffect(), b"opacity")
-                a.setDuration(150)
-                a.setEndValue(1.0)
-                inn.addAnimation(a)
-
-            inn.finished.connect(lambda: setattr(self, "animating", False))
-            inn.start()
-
-        out.finished.connect(swap)
-        out.start()
+    def cancel(self, path):
+        worker = self._inflight.pop(path, None)
+        if worker is None:
+            return
+        worker.cancelled = True
+        # Belum sempat jalan: tidak akan ada sinyal done
+        if self.pool.tryTake(worker):
+            self._workers.pop(id(worker), None)
+
+    def on_worker_done(self, worker_id):
+        worker = self._workers.pop(worker_id, None)
+        if worker is not None and self._inflight.get(worker.path) is worker:
+            del self._inflight[worker.path]
+
+    def prefetch(self):
+        # Decode N gambar berikutnya searah scroll, supaya gambar yang
+        # muncul saat digeser sudah ada di cache
+        total = len(self.images)
+        cost = LOAD_SIZE.width() * LOAD_SIZE.height() * 4
+        ahead = min(PREFETCH_AHEAD, PREFETCH_BUDGET // cost, total)
+
+        self._prefetch = [
+            self.images[(self.current_index + step * self.direction) % total]
+            for step in range(1, ahead + 1)
+        ]
+        visible = set(self._wanted.values())
+
+        for path in list(self._inflight):
+            if path not in visible and path not in self._prefetch:
+                self.cancel(path)
+
+        for path in self._prefetch:
+            if path not in self.cache:
+                self.request(path, PREFETCH_PRIORITY)
+
+    def on_image_loaded(self, image, path):
+        self.cache.put(path, QPixmap.fromImage(image))
+
+        # Canvas mengambil gambar dari cache saat paint; hasil untuk
+        # gambar yang sudah lewat cukup masuk cache
+        self.canvas.update()
+
+    def rounded(self, path, center):
+        size = SLOT_SIZES[1] if center else SLOT_SIZES[0]
+        border = "#ffffff" if center else "#444444"
+        dpr = self.canvas.devicePixelRatioF()
+
+        # Varian bulat per ukuran slot/border ikut disimpan di cache LRU
+        key = (path, size.width(), size.height(), border, dpr)
+        rounded = self.cache.get(key, count=False)
+        if rounded is None:
+            pixmap = self.cache.get(path, count=False)
+            if pixmap is None:
+                return None
+            rounded = render_rounded(pixmap, size, self.canvas.radius, QColor(border), dpr)
+            self.cache.put(key, rounded)
+        return rounded
+
+    # ================= NAVIGATION =================
+    @property
+    def animating(self):
+        return self.canvas.is_animating()
+
+    def step(self, direction):
+        if not self.images:
+            return
+        self._user_moved = True
+        self.direction = direction
+        self.current_index = (self.current_index + direction) % len(self.images)
+        self.update_display()
+        self.canvas.slide(direction)
 
     def keyPressEvent(self, e):
         if e.key() == Qt.Key.Key_Right:
-            self.run_fade(1)
+            self.step(1)
         elif e.key() == Qt.Key.Key_Left:
-            self.run_fade(-1)
+            self.step(-1)
         elif e.key() in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            if not self.images:
+                return
+            # Variant per-monitor dibuat + di-apply di proses terpisah,
+            # window bisa langsung tertutup
             subprocess.Popen([
-                "swww", "img", self.images[self.current_index],
+                sys.executable, os.path.join(HERE, "wallpaper_variants.py"),
+                self.images[self.current_index],
                 "--transition-type", "grow",
                 "--transition-fps", "60"
-            ])
+            ], start_new_session=True)
             self.close()
         elif e.key() == Qt.Key.Key_Escape:
-            self.close()
+            if self.query:
+                self.query = ""
+                self.apply_filter()
+            else:
+                self.close()
+        elif e.key() == Qt.Key.Key_Tab:
+            # Hanya wallpaper yang resolusi & aspect-nya cocok dengan monitor
+            self.fit_screen = not self.fit_screen
+            self.apply_filter()
+        elif e.key() == Qt.Key.Key_Backspace:
+            if self.query:
+                self.query = self.query[:-1]
+                self.apply_filter()
+        elif e.text().isprintable() and e.text() and not (
+                e.modifiers() & (Qt.KeyboardModifier.ControlModifier |
+                                 Qt.KeyboardModifier.AltModifier)):
+            # Ketik untuk mencari berdasarkan nama file
+            self.query += e.text()
+            self.apply_filter()
+
+    def closeEvent(self, e):
+        self.index_stop.set()
+        for path in list(self._inflight):
+            self.cancel(path)
+        self.pool.clear()
+        super().closeEvent(e)
 
 
 # ================= ENTRY =================
+def warm_cache():
+    thumbs = ThumbnailCache()
+    index = WallpaperIndex()
+    index.load()
+    index.refresh()
+    images = index.images()
+    done = thumbs.warm(images, [LOAD_SIZE])
+    removed = thumbs.evict()
+    print(f"{done} thumbnail dibuat, {removed} dihapus ({len(images)} wallpaper)")
+
+
 if __name__ == "__main__":
+    # Isi cache thumbnail sekaligus tanpa membuka window:
+    #   python3 choose-wallpaper.py --warm
+    if "--warm" in sys.argv:
+        QCoreApplication(sys.argv)
+        warm_cache()
+        sys.exit(0)
+
     app = QApplication(sys.argv)
     
     # --- UPDATE METADATA APLIKASI ---
@@ -241,4 +563,12 @@ if __name__ == "__main__":
     w.move(geo.topLeft())
 
     w.show()
-    sys.exit(app.exec())
+    ret = app.exec()
+    # Decode yang sedang jalan diselesaikan dulu sebelum interpreter berhenti
+    w.pool.waitForDone()
+    w.thumbs.evict()
+
+    # Statistik hit/miss/eviction untuk tuning CHOOSE_WALLPAPER_CACHE_MB
+    if "--stats" in sys.argv:
+        print(json.dumps(w.cache.stats()), file=sys.stderr)
+    sys.exit(ret)
@@ -1,11 +1,9 @@
 #!/bin/bash
 
-# Folder tempat wallpaper Anda disimpan
-DIR=$HOME/Pictures/wallpapers/
-
-# Ambil gambar secara acak
-PICS=($DIR/*)
-RANDOM_PIC=${PICS[$RANDOM % ${#PICS[@]}]}
-
-# Ganti wallpaper dengan efek transisi zoom/type sesuai tema search
-swww img "$RANDOM_PIC" --transition-type grow --transition-pos center --transition-duration 1.5 --transition-fps 60
+# Ganti wallpaper ke berikutnya dalam urutan acak tanpa pengulangan
+# (state di ~/.cache/choose-wallpaper/rotation.json). Variant per-monitor
+# wallpaper berikutnya sudah disiapkan di panggilan sebelumnya.
+#
+# Mode daemon, ganti tiap 30 menit:
+#   python3 ~/.config/hypr/scripts/wallpaper-rotate.py --interval 1800
+python3 ~/.config/hypr/scripts/wallpaper-rotate.py
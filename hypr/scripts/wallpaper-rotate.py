@@ -0,0 +1,132 @@
+import sys, os, json, time, random, signal, argparse
+from PyQt6.QtCore import QCoreApplication
+from wallpaper_cache import CACHE_DIR, evict_dir, atomic_json_write
+from wallpaper_index import WallpaperIndex
+from wallpaper_variants import (
+    VARIANT_DIR, VARIANT_BUDGET, monitors, prepare, apply
+)
+
+STATE_FILE = os.path.join(CACHE_DIR, "rotation.json")
+SWWW_ARGS = [
+    "--transition-type", "grow", "--transition-pos", "center",
+    "--transition-duration", "1.5", "--transition-fps", "60"
+]
+
+
+# ================= SHUFFLE STATE =================
+# Urutan acak yang disimpan antar panggilan: setiap wallpaper muncul
+# sekali per putaran sebelum ada yang diulang.
+class Rotation:
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self.order = []
+        self.pos = 0
+        self.last = None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            self.order = data.get("order", [])
+            self.pos = data.get("pos", 0)
+            self.last = data.get("last")
+        except (OSError, ValueError):
+            pass
+
+    def sync(self, images):
+        # Buang yang sudah dihapus; file baru disisipkan acak di sisa putaran
+        current = set(images)
+        played = [p for p in self.order[:self.pos] if p in current]
+        upcoming = [p for p in self.order[self.pos:] if p in current]
+
+        known = set(played) | set(upcoming)
+        for p in images:
+            if p not in known:
+                upcoming.insert(random.randint(0, len(upcoming)), p)
+
+        self.order = played + upcoming
+        self.pos = len(played)
+
+    def reshuffle(self):
+        random.shuffle(self.order)
+        # Jangan mulai putaran baru dengan wallpaper yang baru saja tampil
+        if len(self.order) > 1 and self.order[0] == self.last:
+            self.order[0], self.order[-1] = self.order[-1], self.order[0]
+        self.pos = 0
+
+    def peek(self):
+        if not self.order:
+            return None
+        if self.pos >= len(self.order):
+            self.reshuffle()
+        return self.order[self.pos]
+
+    def next(self):
+        path = self.peek()
+        if path is not None:
+            self.last = path
+            self.pos += 1
+        return path
+
+    def save(self):
+        atomic_json_write(self.path, {"order": self.order, "pos": self.pos, "last": self.last})
+
+
+# ================= SWITCH =================
+def switch(index, rotation, outputs):
+    # index.json ikut di-refresh choose-wallpaper.py, jadi refresh() di sini
+    # bisa saja False walau isinya berubah; sync selalu (murah, O(n) set)
+    index.refresh()
+    rotation.sync(index.images())
+
+    path = rotation.next()
+    # peek() bisa memulai putaran baru; simpan setelahnya supaya urutan
+    # yang di-look-ahead sama dengan yang dipakai di panggilan berikutnya
+    upcoming = rotation.peek()
+    rotation.save()
+    if path is None:
+        return None
+
+    # Variant wallpaper ini biasanya sudah dibuat saat look-ahead
+    for p in apply(path, outputs, SWWW_ARGS):
+        p.wait()
+
+    # Look-ahead: siapkan variant wallpaper berikutnya sekarang, supaya
+    # switch selanjutnya tidak perlu glob atau decode sama sekali
+    if upcoming is not None and outputs:
+        prepare(upcoming, outputs)
+    evict_dir(VARIANT_DIR, VARIANT_BUDGET)
+    return path
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Rotasi wallpaper tanpa pengulangan")
+    ap.add_argument("--interval", type=float, default=0,
+                    help="detik antar ganti; 0 = ganti sekali lalu keluar")
+    args = ap.parse_args()
+
+    QCoreApplication(sys.argv)
+    index = WallpaperIndex()
+    index.load()
+    rotation = Rotation()
+
+    if args.interval <= 0:
+        switch(index, rotation, monitors())
+        return
+
+    # Mode daemon: `pkill -USR1 -f wallpaper-rotate.py` untuk ganti sekarang
+    wake = {"now": False}
+
+    def on_signal(signum, frame):
+        wake["now"] = True
+
+    signal.signal(signal.SIGUSR1, on_signal)
+
+    while True:
+        switch(index, rotation, monitors())
+        deadline = time.monotonic() + args.interval
+        while time.monotonic() < deadline and not wake["now"]:
+            time.sleep(max(0.0, min(1.0, deadline - time.monotonic())))
+        wake["now"] = False
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import os, json, hashlib, struct, threading
+from collections import OrderedDict
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtGui import QImage, QImageReader, QImageIOHandler
+from PyQt6.QtCore import Qt
+
+CACHE_HOME = os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+CACHE_DIR = os.path.join(CACHE_HOME, "choose-wallpaper")
+
+
+def atomic_json_write(path, data):
+    # Tulis ke file sementara lalu rename, supaya proses lain (picker,
+    # rotasi, apply) tidak pernah membaca JSON setengah jadi
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+# ================= DECODE =================
+def decode_scaled(path, size):
+    reader = QImageReader(path)
+    src = reader.size()
+
+    # JPEG (DCT scaling) dan WebP bisa di-decode langsung mendekati ukuran
+    # target, tanpa pernah membuat bitmap 8K penuh di memori
+    if src.isValid() and reader.supportsOption(QImageIOHandler.ImageOption.ScaledSize):
+        target = src.scaled(size, Qt.AspectRatioMode.KeepAspectRatioByExpanding)
+        if target.width() < src.width():
+            reader.setScaledSize(target)
+            img = reader.read()
+            if not img.isNull():
+                return img
+            reader = QImageReader(path)
+
+    # Fallback: format tanpa decode berskala (PNG dll.) -> decode penuh
+    img = reader.read()
+    if img.isNull():
+        return None
+
+    return img.scaled(
+        size,
+        Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+        Qt.TransformationMode.SmoothTransformation
+    )
+
+
+# ================= THUMBNAIL CACHE =================
+def evict_dir(root, max_bytes):
+    # Hapus file dengan mtime tertua sampai total ukuran <= max_bytes;
+    # pemakai cache meng-update mtime saat hit, jadi ini LRU
+    entries = []
+    total = 0
+    for base, _, files in os.walk(root):
+        for f in files:
+            full = os.path.join(base, f)
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, full))
+            total += st.st_size
+
+    removed = 0
+    for _, size, full in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(full)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def png_text(path):
+    # QImageReader.text() memotong key di ':' (Thumb::MTime jadi "Thumb"),
+    # jadi chunk tEXt dibaca manual. Berhenti di IDAT, pixel tidak di-decode.
+    meta = {}
+    try:
+        with open(path, "rb") as f:
+            if f.read(8) != b"\x89PNG\r\n\x1a\n":
+                return meta
+            while True:
+                head = f.read(8)
+                if len(head) < 8:
+                    break
+                length, kind = struct.unpack(">I4s", head)
+                if kind == b"IDAT":
+                    break
+                data = f.read(length)
+                f.seek(4, os.SEEK_CUR)
+                if kind == b"tEXt" and b"\0" in data:
+                    key, value = data.split(b"\0", 1)
+                    meta[key.decode("latin-1")] = value.decode("latin-1")
+    except OSError:
+        pass
+    return meta
+
+
+# Layout mengikuti freedesktop thumbnail spec: nama file = md5(URI sumber),
+# PNG membawa tEXt Thumb::URI / Thumb::MTime / Thumb::Size untuk validasi.
+# Ukuran slot carousel tidak ada di spec, jadi tiap ukuran punya folder sendiri.
+class ThumbnailCache:
+    def __init__(self, root=None, max_bytes=256 * 1024 * 1024):
+        self.root = root or os.path.join(CACHE_DIR, "thumbnails")
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def uri(path):
+        return "file://" + quote(os.path.abspath(path))
+
+    def thumb_path(self, path, size):
+        name = hashlib.md5(self.uri(path).encode()).hexdigest() + ".png"
+        return os.path.join(self.root, f"{size.width()}x{size.height()}", name)
+
+    def is_fresh(self, path, size):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+
+        meta = png_text(self.thumb_path(path, size))
+        return (meta.get("Thumb::MTime") == str(int(st.st_mtime)) and
+                meta.get("Thumb::Size") == str(st.st_size))
+
+    def load(self, path, size):
+        if not self.is_fresh(path, size):
+            return None
+
+        thumb = self.thumb_path(path, size)
+        img = QImage(thumb)
+        if img.isNull():
+            return None
+
+        # mtime thumbnail dipakai sebagai "last used" untuk eviction
+        try:
+            os.utime(thumb)
+        except OSError:
+            pass
+        return img
+
+    def store(self, path, size, image):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+
+        thumb = self.thumb_path(path, size)
+        os.makedirs(os.path.dirname(thumb), exist_ok=True)
+
+        image.setText("Thumb::URI", self.uri(path))
+        image.setText("Thumb::MTime", str(int(st.st_mtime)))
+        image.setText("Thumb::Size", str(st.st_size))
+
+        # Tulis ke file sementara lalu rename, supaya pembaca lain
+        # tidak pernah melihat PNG setengah jadi
+        tmp = f"{thumb}.{os.getpid()}-{threading.get_ident()}.tmp"
+        if not image.save(tmp, "PNG"):
+            return False
+        os.replace(tmp, thumb)
+        return True
+
+    def get(self, path, size):
+        img = self.load(path, size)
+        if img is None:
+            img = decode_scaled(path, size)
+            if img is not None:
+                self.store(path, size, img)
+        return img
+
+    def evict(self):
+        return evict_dir(self.root, self.max_bytes)
+
+    def warm(self, paths, sizes, workers=None):
+        def job(path):
+            done = 0
+            for size in sizes:
+                if self.is_fresh(path, size):
+                    continue
+                img = decode_scaled(path, size)
+                if img is not None and self.store(path, size, img):
+                    done += 1
+            return done
+
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as ex:
+            return sum(ex.map(job, paths))
+
+
+# ================= PIXMAP CACHE =================
+# LRU di memori dengan batas byte pixmap, bukan jumlah entry
+class PixmapCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+
+    @staticmethod
+    def cost(pixmap):
+        return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, count=True):
+        # count=False untuk lookup turunan (mis. varian bulat) supaya
+        # hit ratio tetap mencerminkan decode yang dihindari
+        pixmap = self._items.get(key)
+        if pixmap is None:
+            if count:
+                self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        if count:
+            self.hits += 1
+        return pixmap
+
+    def put(self, key, pixmap):
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.bytes -= self.cost(old)
+
+        self._items[key] = pixmap
+        self.bytes += self.cost(pixmap)
+
+        # Entry terakhir selalu disimpan walau lebih besar dari budget
+        while self.bytes > self.max_bytes and len(self._items) > 1:
+            _, evicted = self._items.popitem(last=False)
+            self.bytes -= self.cost(evicted)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._items),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,338 @@
+import sys, os, json, sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtGui import QImage, QImageReader, QColor
+from PyQt6.QtCore import Qt, QSize
+from wallpaper_cache import CACHE_DIR, decode_scaled, atomic_json_write
+
+VALID_EXT = ('.png', '.jpg', '.jpeg', '.webp')
+INDEX_FILE = os.path.join(CACHE_DIR, "index.json")
+
+
+def wallpaper_dir():
+    wp = os.path.expanduser("~/Pictures/wallpapers/")
+    return wp if os.path.exists(wp) else os.path.expanduser("~/Pictures")
+
+
+# ================= WALLPAPER INDEX =================
+# Daftar wallpaper (rekursif) yang disimpan antar sesi. Refresh hanya
+# membaca ulang folder yang mtime-nya berubah: menambah/menghapus file
+# selalu mengubah mtime folder induknya, jadi biaya refresh = satu stat
+# per folder, bukan satu per file.
+class WallpaperIndex:
+    def __init__(self, root=None, path=INDEX_FILE):
+        self.root = os.path.abspath(root or wallpaper_dir())
+        self.path = path
+        self.dirs = {}
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+
+        if data.get("root") == self.root:
+            self.dirs = data.get("dirs", {})
+        return self.images()
+
+    def images(self):
+        return sorted(
+            os.path.join(d, f)
+            for d, entry in self.dirs.items()
+            for f in entry["files"]
+        )
+
+    def refresh(self):
+        dirs = {}
+        changed = False
+        stack = [self.root]
+
+        while stack:
+            d = stack.pop()
+            try:
+                mtime = os.stat(d).st_mtime_ns
+            except OSError:
+                continue
+
+            entry = self.dirs.get(d)
+            if entry is None or entry["mtime"] != mtime:
+                try:
+                    entry = self._scan(d, mtime)
+                except OSError:
+                    continue
+                changed = True
+
+            dirs[d] = entry
+            stack.extend(os.path.join(d, s) for s in entry["subdirs"])
+
+        # Folder yang dihapus tidak muncul lagi di walk
+        changed = changed or dirs.keys() != self.dirs.keys()
+        self.dirs = dirs
+        if changed:
+            self.save()
+        return changed
+
+    @staticmethod
+    def _scan(d, mtime):
+        files, subdirs = [], []
+        with os.scandir(d) as it:
+            for e in it:
+                if e.name.startswith('.'):
+                    continue
+                if e.is_dir(follow_symlinks=False):
+                    subdirs.append(e.name)
+                elif e.name.lower().endswith(VALID_EXT):
+                    files.append(e.name)
+        return {"mtime": mtime, "files": files, "subdirs": subdirs}
+
+    def save(self):
+        atomic_json_write(self.path, {"root": self.root, "dirs": self.dirs})
+
+
+# ================= METADATA INDEX =================
+# Dimensi, aspect, warna dominan dan perceptual hash per wallpaper di
+# SQLite, supaya filter/search/duplikat cukup query tanpa decode ulang.
+META_FILE = os.path.join(CACHE_DIR, "metadata.sqlite")
+HASH_SIZE = QSize(9, 8)
+
+
+def _signed64(v):
+    # SQLite INTEGER itu signed 64-bit
+    return v - (1 << 64) if v >= 1 << 63 else v
+
+
+def _pixels(img, fmt):
+    img = img.convertToFormat(fmt)
+    rows = []
+    bpp = 1 if fmt == QImage.Format.Format_Grayscale8 else 4
+    for y in range(img.height()):
+        ptr = img.constScanLine(y)
+        ptr.setsize(img.width() * bpp)
+        rows.append(bytes(ptr))
+    return rows
+
+
+def dhash(img):
+    small = img.scaled(HASH_SIZE, Qt.AspectRatioMode.IgnoreAspectRatio,
+                       Qt.TransformationMode.SmoothTransformation)
+    bits = 0
+    for row in _pixels(small, QImage.Format.Format_Grayscale8):
+        for x in range(HASH_SIZE.width() - 1):
+            bits = (bits << 1) | (row[x] < row[x + 1])
+    return bits
+
+
+def dominant_color(img):
+    # Warna paling sering setelah dikuantisasi 4 bit/channel, lalu dirata-rata
+    buckets = {}
+    for row in _pixels(img, QImage.Format.Format_RGB32):
+        for i in range(0, len(row), 4):
+            b, g, r = row[i], row[i + 1], row[i + 2]
+            key = (r >> 4, g >> 4, b >> 4)
+            acc = buckets.setdefault(key, [0, 0, 0, 0])
+            acc[0] += r
+            acc[1] += g
+            acc[2] += b
+            acc[3] += 1
+    if not buckets:
+        return 0
+    r, g, b, n = max(buckets.values(), key=lambda a: a[3])
+    return (r // n) << 16 | (g // n) << 8 | (b // n)
+
+
+def hue_group(rgb):
+    # 12 kelompok hue (30 derajat), -1 untuk warna abu-abu/gelap
+    color = QColor((rgb >> 16) & 255, (rgb >> 8) & 255, rgb & 255)
+    if color.hsvSaturation() < 40 or color.value() < 40:
+        return -1
+    return color.hsvHue() // 30
+
+
+def read_metadata(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    size = QImageReader(path).size()
+    small = decode_scaled(path, QSize(32, 18))
+    if small is None or not size.isValid():
+        return None
+
+    color = dominant_color(small)
+    return {
+        "path": path,
+        "mtime": st.st_mtime_ns,
+        "size": st.st_size,
+        "width": size.width(),
+        "height": size.height(),
+        "aspect": size.width() / size.height(),
+        "color": color,
+        "hue": hue_group(color),
+        "phash": _signed64(dhash(small)),
+    }
+
+
+class MetadataIndex:
+    def __init__(self, path=META_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS wallpapers (
+                path TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                mtime INTEGER,
+                size INTEGER,
+                width INTEGER,
+                height INTEGER,
+                aspect REAL,
+                color INTEGER,
+                hue INTEGER,
+                phash INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_dims ON wallpapers(width, height);
+            CREATE INDEX IF NOT EXISTS idx_aspect ON wallpapers(aspect);
+            CREATE INDEX IF NOT EXISTS idx_hue ON wallpapers(hue);
+            CREATE INDEX IF NOT EXISTS idx_phash ON wallpapers(phash);
+        """)
+
+    def close(self):
+        self.db.close()
+
+    def update(self, paths, workers=2, stop=None):
+        known = dict(self.db.execute("SELECT path, mtime FROM wallpapers"))
+        current = set(paths)
+
+        with self.db:
+            self.db.executemany("DELETE FROM wallpapers WHERE path = ?",
+                                [(p,) for p in known if p not in current])
+            # Nama langsung masuk supaya search sudah lengkap sebelum
+            # metadata selesai dihitung
+            self.db.executemany(
+                "INSERT OR IGNORE INTO wallpapers(path, name) VALUES (?, ?)",
+                [(p, os.path.basename(p).lower()) for p in paths if p not in known])
+
+        stale = []
+        for p in paths:
+            try:
+                if known.get(p) != os.stat(p).st_mtime_ns:
+                    stale.append(p)
+            except OSError:
+                continue
+
+        def read(path):
+            # Sudah dibatalkan: sisa antrean lewat tanpa decode
+            if stop is not None and stop.is_set():
+                return None
+            return read_metadata(path)
+
+        done = 0
+        ex = ThreadPoolExecutor(max_workers=workers)
+        try:
+            for meta in ex.map(read, stale):
+                if stop is not None and stop.is_set():
+                    break
+                if meta is None:
+                    continue
+                with self.db:
+                    self.db.execute("""
+                        UPDATE wallpapers SET mtime = :mtime, size = :size,
+                            width = :width, height = :height, aspect = :aspect,
+                            color = :color, hue = :hue, phash = :phash
+                        WHERE path = :path
+                    """, meta)
+                done += 1
+        finally:
+            # Worker executor di-join saat interpreter keluar; file yang
+            # belum mulai dibuang supaya proses tidak tertahan
+            ex.shutdown(wait=False, cancel_futures=True)
+        return done
+
+    # ---------- Queries ----------
+    def get(self, path):
+        row = self.db.execute(
+            "SELECT width, height, color FROM wallpapers WHERE path = ?", (path,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return {"width": row[0], "height": row[1], "color": row[2]}
+
+    def search(self, text):
+        sql = "SELECT path FROM wallpapers"
+        terms = text.lower().split()
+        if terms:
+            # Substring biasa; LIKE akan membaca '_' dan '%' di nama file sebagai wildcard
+            sql += " WHERE " + " AND ".join("instr(name, ?) > 0" for _ in terms)
+        return {r[0] for r in self.db.execute(sql, terms)}
+
+    def fitting(self, width, height, tolerance=0.05):
+        # Minimal seresolusi monitor dan aspect ratio-nya mirip
+        return {r[0] for r in self.db.execute("""
+            SELECT path FROM wallpapers
+            WHERE width >= ? AND height >= ? AND ABS(aspect - ?) <= ?
+        """, (width, height, width / height, tolerance))}
+
+    def by_hue(self, hue):
+        return {r[0] for r in self.db.execute(
+            "SELECT path FROM wallpapers WHERE hue = ?", (hue,))}
+
+    def color_groups(self):
+        groups = {}
+        for path, hue in self.db.execute(
+                "SELECT path, hue FROM wallpapers WHERE hue IS NOT NULL ORDER BY hue, path"):
+            groups.setdefault(hue, []).append(path)
+        return groups
+
+    def duplicates(self, max_distance=4):
+        rows = [(p, h & ((1 << 64) - 1)) for p, h in self.db.execute(
+            "SELECT path, phash FROM wallpapers WHERE phash IS NOT NULL")]
+
+        # Pigeonhole: hash dipotong jadi max_distance+1 bagian; dua hash
+        # dengan jarak <= max_distance pasti sama persis di salah satu
+        # potongan, jadi cukup bandingkan sesama isi bucket
+        chunks = max_distance + 1
+        width = 64 // chunks
+        buckets = {}
+        for i, (_, h) in enumerate(rows):
+            for c in range(chunks):
+                key = (c, (h >> (c * width)) & ((1 << width) - 1))
+                buckets.setdefault(key, []).append(i)
+
+        pairs = set()
+        for members in buckets.values():
+            for a in range(len(members)):
+                for b in range(a + 1, len(members)):
+                    i, j = members[a], members[b]
+                    if (i, j) in pairs:
+                        continue
+                    if bin(rows[i][1] ^ rows[j][1]).count("1") <= max_distance:
+                        pairs.add((i, j))
+        return sorted((rows[i][0], rows[j][0]) for i, j in pairs)
+
+
+if __name__ == "__main__":
+    # Contoh:
+    #   python3 wallpaper_index.py duplicates
+    #   python3 wallpaper_index.py fit 2560x1440
+    #   python3 wallpaper_index.py colors
+    #   python3 wallpaper_index.py search forest
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "update"
+    index = WallpaperIndex()
+    index.load()
+    index.refresh()
+    meta = MetadataIndex()
+
+    if cmd == "update":
+        print(f"{meta.update(index.images(), workers=os.cpu_count())} wallpaper diindex")
+    elif cmd == "duplicates":
+        for a, b in meta.duplicates():
+            print(f"{a}\n  ~ {b}")
+    elif cmd == "fit":
+        w, h = (int(v) for v in sys.argv[2].lower().split("x"))
+        print("\n".join(sorted(meta.fitting(w, h))))
+    elif cmd == "colors":
+        for hue, paths in meta.color_groups().items():
+            label = "gray" if hue == -1 else f"{hue * 30}°"
+            print(f"{label}: {len(paths)}")
+    elif cmd == "search":
+        print("\n".join(sorted(meta.search(" ".join(sys.argv[2:])))))
@@ -0,0 +1,136 @@
+import sys, os, json, hashlib, subprocess
+from concurrent.futures import ThreadPoolExecutor
+from PyQt6.QtGui import QImageReader
+from PyQt6.QtCore import QCoreApplication, QRect, QSize
+from wallpaper_cache import CACHE_DIR, decode_scaled, evict_dir, atomic_json_write
+
+VARIANT_DIR = os.path.join(CACHE_DIR, "variants")
+SOURCES_FILE = os.path.join(CACHE_DIR, "variant-sources.json")
+VARIANT_BUDGET = 1024 * 1024 * 1024
+TRANSITION = ["--transition-type", "grow", "--transition-fps", "60"]
+
+
+# ================= MONITORS =================
+def monitors():
+    try:
+        out = subprocess.check_output(["hyprctl", "monitors", "-j"], text=True)
+        data = json.loads(out)
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return []
+
+    result = []
+    for m in data:
+        w, h = m["width"], m["height"]
+        # transform 1/3/5/7 = diputar 90/270 derajat
+        if m.get("transform", 0) % 2:
+            w, h = h, w
+        result.append({"name": m["name"], "size": QSize(w, h)})
+    return result
+
+
+# ================= VARIANTS =================
+# Wallpaper yang sudah di-crop ke resolusi native tiap output, supaya
+# swww tidak perlu decode + resize file 8K setiap kali ganti wallpaper.
+def variant_path(path, size):
+    st = os.stat(path)
+    key = f"{os.path.abspath(path)}:{st.st_mtime_ns}:{st.st_size}"
+    ext = os.path.splitext(path)[1].lower().replace(".jpeg", ".jpg")
+    name = hashlib.md5(key.encode()).hexdigest() + ext
+    return os.path.join(VARIANT_DIR, f"{size.width()}x{size.height()}", name)
+
+
+def ensure_variant(path, size):
+    try:
+        out = variant_path(path, size)
+    except OSError:
+        return path
+
+    if os.path.exists(out):
+        os.utime(out)
+        return out
+
+    # Sudah pas resolusi monitor, tidak perlu variant
+    if QImageReader(path).size() == size:
+        return path
+
+    img = decode_scaled(path, size)
+    if img is None:
+        return path
+
+    # Crop tengah, sama seperti mode resize default swww
+    x = (img.width() - size.width()) // 2
+    y = (img.height() - size.height()) // 2
+    img = img.copy(QRect(x, y, size.width(), size.height()))
+
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    ext = os.path.splitext(out)[1]
+    tmp = f"{out}.{os.getpid()}.tmp{ext}"
+    if not img.save(tmp, quality=95 if ext in (".jpg", ".webp") else -1):
+        return path
+    os.replace(tmp, out)
+    return out
+
+
+def prepare(path, outputs, workers=None):
+    # Satu job per resolusi unik, dijalankan paralel di semua core
+    sizes = {(o["size"].width(), o["size"].height()): o["size"] for o in outputs}
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as ex:
+        done = dict(zip(sizes, ex.map(lambda s: ensure_variant(path, s), sizes.values())))
+
+    variants = {o["name"]: done[(o["size"].width(), o["size"].height())] for o in outputs}
+    remember_sources({v: os.path.abspath(path) for v in variants.values() if v != path})
+    return variants
+
+
+# ================= SOURCE MAP =================
+# swww query melaporkan path variant; map ini mengembalikannya ke file asli
+def load_sources():
+    try:
+        with open(SOURCES_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def remember_sources(mapping):
+    if not mapping:
+        return
+    sources = load_sources()
+    sources = {v: src for v, src in sources.items() if os.path.exists(v)}
+    sources.update(mapping)
+    atomic_json_write(SOURCES_FILE, sources)
+
+
+def source_of(path, sources=None):
+    if sources is None:
+        sources = load_sources()
+    return sources.get(path, path)
+
+
+# ================= APPLY =================
+def apply(path, outputs=None, swww_args=TRANSITION):
+    if outputs is None:
+        outputs = monitors()
+
+    if not outputs:
+        return [subprocess.Popen(["swww", "img", path, *swww_args])]
+
+    # Semua output di-apply bersamaan, masing-masing dengan variant native-nya
+    variants = prepare(path, outputs)
+    return [
+        subprocess.Popen(["swww", "img", "-o", name, variant, *swww_args])
+        for name, variant in variants.items()
+    ]
+
+
+if __name__ == "__main__":
+    # python3 wallpaper_variants.py /path/wallpaper.jpg [argumen swww ...]
+    if len(sys.argv) < 2:
+        print(f"usage: {sys.argv[0]} IMAGE [swww img args...]", file=sys.stderr)
+        sys.exit(1)
+
+    QCoreApplication(sys.argv)
+    procs = apply(sys.argv[1], swww_args=sys.argv[2:] or TRANSITION)
+    for p in procs:
+        p.wait()
+    evict_dir(VARIANT_DIR, VARIANT_BUDGET)
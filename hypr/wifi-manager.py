@@ -1,12 +1,9 @@
 import sys
-import subprocess
-import threading
 from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QPushButton, 
                              QLabel, QHBoxLayout, QScrollArea, QLineEdit, QFrame)
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QObject
-
-class WorkerSignals(QObject):
-    finished = pyqtSignal(list)
+from PyQt6.QtCore import Qt, QTimer
+from wifi_backend import make_backend, load_cache, CommandQueue, CANCELLED
+from keyed_list import KeyedList
 
 class WifiItem(QFrame):
     def __init__(self, net, parent_gui):
@@ -23,7 +20,6 @@ class WifiItem(QFrame):
 
         # Baris Utama
         self.row_header = QWidget()
-        active = self.net['active']
         
         # Samakan warna background dan border (aktif & tidak aktif sama)
         bg = "rgba(255, 255, 255, 0.05)"
@@ -32,15 +28,11 @@ class WifiItem(QFrame):
         self.setStyleSheet(f"background-color: {bg}; border: {border}; border-radius: 12px; margin: 2px;")
         
         h_layout = QHBoxLayout(self.row_header)
-        sig = self.net['signal']
-
-        status_prefix = "✧ " if active else ""
-        icon = "" if active else ""
         
-        self.label_info = QLabel(f"{status_prefix}{icon}{self.net['ssid']} ({sig}%)")
+        self.label_info = QLabel()
         self.label_info.setStyleSheet("color: #ffffff; font-weight: bold; background: transparent; border: none;")
         
-        self.btn_expand = QPushButton("Active" if active else "Connect")
+        self.btn_expand = QPushButton()
         self.btn_expand.setFixedWidth(80)
         self.btn_expand.setStyleSheet("background: rgba(255,255,255,0.1); border: none; font-size: 10px; font-weight: bold; padding: 5px;")
         self.btn_expand.clicked.connect(self.toggle_accordion)
@@ -55,7 +47,7 @@ class WifiItem(QFrame):
             padding-bottom: 8px;
             border-radius: 8px;
         """)
-        btn_del.clicked.connect(lambda: self.parent_gui.delete_wifi(self.net['ssid']))
+        btn_del.clicked.connect(lambda: self.parent_gui.delete_wifi(self.net['ssid'], self.net.get('profile')))
 
         h_layout.addWidget(self.label_info)
         h_layout.addStretch()
@@ -101,21 +93,55 @@ class WifiItem(QFrame):
         self.input_container.setVisible(False)
         layout.addWidget(self.input_container)
 
+        self.set_data(self.net)
+
+    def set_data(self, net):
+        # Dipanggil KeyedList saat refresh; widget dan isi password tetap
+        self.net = net
+        active = net['active']
+        status_prefix = "✧ " if active else ""
+        icon = "" if active else ""
+        lock = " 🔒" if net.get('security') else ""
+        bands = "/".join(net.get('bands', []))
+        band_text = f" · {bands}G" if bands else ""
+        text = f"{status_prefix}{icon}{net['ssid']} ({net['signal']}%){band_text}{lock}"
+        if self.label_info.text() != text:
+            self.label_info.setText(text)
+            self.label_info.setToolTip(f"{net.get('security') or 'Open'} · {net.get('bssids', 1)} BSSID")
+
+        btn_text = "Active" if active else "Connect"
+        if self.btn_expand.text() != btn_text:
+            self.btn_expand.setText(btn_text)
+        if active and self.is_expanded:
+            self.set_expanded(False)
+
     def toggle_accordion(self):
         if self.net['active']: return
-        self.is_expanded = not self.is_expanded
-        self.input_container.setVisible(self.is_expanded)
-        if self.is_expanded: self.pass_input.setFocus()
+        # Jaringan dengan profil tersimpan: langsung connect tanpa password
+        if self.net.get('profile') and not self.is_expanded:
+            self.parent_gui.activate_profile(self.net['ssid'], self.net['profile'])
+            return
+        self.set_expanded(not self.is_expanded)
+
+    def set_expanded(self, expanded):
+        self.is_expanded = expanded
+        self.input_container.setVisible(expanded)
+        if expanded: self.pass_input.setFocus()
 
     def submit_connection(self):
         pwd = self.pass_input.text()
-        if pwd: self.parent_gui.execute_connect(self.net['ssid'], pwd)
+        if pwd: self.parent_gui.execute_connect(self.net['ssid'], pwd, self.net.get('profile'))
 
 class GlassWifi(QWidget):
     def __init__(self):
         super().__init__()
-        self.signals = WorkerSignals()
-        self.signals.finished.connect(self.populate_list)
+        # Backend D-Bus mengirim update live; nmcli hanya saat refresh
+        self.backend = make_backend()
+        self.backend.networks.connect(self.populate_list)
+        self.backend.scanning.connect(self.set_scanning)
+        self.commands = CommandQueue(self)
+        self.commands.finished.connect(self.on_command_finished)
+        self.up_ssid = None
         self.initUI()
 
     def initUI(self):
@@ -150,6 +176,13 @@ class GlassWifi(QWidget):
         header.addWidget(close_btn)
         self.main_layout.addLayout(header)
 
+        # Pesan error dari nmcli (stderr), disembunyikan kalau tidak ada
+        self.status_label = QLabel()
+        self.status_label.setWordWrap(True)
+        self.status_label.setStyleSheet("color: #ff6b6b; font-size: 11px; background: transparent; padding: 0 5px;")
+        self.status_label.setVisible(False)
+        self.main_layout.addWidget(self.status_label)
+
         self.scroll = QScrollArea()
         self.scroll.setWidgetResizable(True)
         self.scroll_content = QWidget()
@@ -157,6 +190,7 @@ class GlassWifi(QWidget):
         self.list_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
         self.scroll.setWidget(self.scroll_content)
         self.main_layout.addWidget(self.scroll)
+        self.rows = KeyedList(self.list_layout, lambda n: n['ssid'], lambda n: WifiItem(n, self))
 
         self.setStyleSheet("QWidget { background-color: rgba(15, 15, 15, 0.9); border-radius: 20px; color: white; }")
         
@@ -165,56 +199,91 @@ class GlassWifi(QWidget):
         self.frames = ["|", "/", "-", "\\"]
         self.f_idx = 0
 
-        self.refresh_list()
+        # Stale-while-revalidate: tampilkan hasil scan terakhir dulu, backend
+        # baru dijalankan setelah window tergambar
+        cached = load_cache()
+        if cached:
+            self.populate_list(cached)
+        QTimer.singleShot(0, self.backend.start)
 
     def animate_loading(self):
         self.f_idx = (self.f_idx + 1) % len(self.frames)
         self.reload_btn.setText(self.frames[self.f_idx])
 
     def refresh_list(self):
-        self.loading_timer.start(100)
-        self.reload_btn.setEnabled(False)
-        threading.Thread(target=self.fetch_data, daemon=True).start()
-
-    def fetch_data(self):
-        devs = []
-        try:
-            subprocess.run(["nmcli", "radio", "wifi", "on"], check=False)
-            subprocess.run(["nmcli", "device", "wifi", "rescan"], check=False)
-            out = subprocess.check_output(["nmcli", "-t", "-f", "ACTIVE,SSID,BARS,SIGNAL", "device", "wifi", "list"]).decode().splitlines()
-            seen = set()
-            for line in out:
-                p = line.split(':')
-                if len(p) >= 4 and p[1].strip() and p[1] not in seen:
-                    devs.append({"active": p[0] == "yes", "ssid": p[1], "signal": int(p[3] if p[3].isdigit() else 0)})
-                    seen.add(p[1])
-            devs.sort(key=lambda x: (x['active'], x['signal']), reverse=True)
-            self.signals.finished.emit(devs)
-        except: self.signals.finished.emit([])
+        self.backend.rescan()
+
+    def set_scanning(self, active):
+        if active:
+            self.loading_timer.start(100)
+            self.reload_btn.setEnabled(False)
+        else:
+            self.loading_timer.stop()
+            self.reload_btn.setText("↻")
+            self.reload_btn.setEnabled(True)
 
     def populate_list(self, networks):
-        self.loading_timer.stop()
-        self.reload_btn.setText("↻")
-        self.reload_btn.setEnabled(True)
-        self.header_label.setText("📡 Wi-Fi Switcher")
-        
-        while self.list_layout.count():
-            item = self.list_layout.takeAt(0)
-            if item.widget(): item.widget().deleteLater()
-            
-        for net in networks:
-            self.list_layout.addWidget(WifiItem(net, self))
-
-    def execute_connect(self, ssid, password):
+        self.rows.update(networks)
+
+    def start_connecting(self):
+        # Connect baru menggantikan connect yang masih antre/berjalan
+        self.commands.cancel("connect")
+        self.commands.cancel("up")
         self.header_label.setText("Connecting...")
-        subprocess.run(["nmcli", "connection", "delete", ssid], check=False)
-        subprocess.Popen(["nmcli", "device", "wifi", "connect", ssid, "password", password])
-        QTimer.singleShot(5000, self.refresh_list)
+        self.status_label.setVisible(False)
 
-    def delete_wifi(self, name):
-        subprocess.run(["nmcli", "connection", "delete", name])
+    def activate_profile(self, ssid, profile):
+        # Fast path: profil yang sudah ada cukup diaktifkan, tanpa hapus/buat ulang
+        self.start_connecting()
+        self.up_ssid = ssid
+        self.commands.run(["nmcli", "--wait", "30", "connection", "up", "uuid", profile], "up")
+
+    def delete_cmd(self, ssid, profile=None):
+        # Nama profil belum tentu sama dengan SSID ("Cafe 1", profil yang
+        # di-rename); UUID selalu tepat. Nama hanya untuk jaringan tanpa profil
+        if profile:
+            return ["nmcli", "connection", "delete", "uuid", profile]
+        return ["nmcli", "connection", "delete", ssid]
+
+    def execute_connect(self, ssid, password, profile=None):
+        # Jaringan baru atau profil yang gagal: profil dibuat ulang dengan password
+        self.start_connecting()
+        # Profil lama boleh saja tidak ada, hasilnya tidak dilaporkan (tag kosong)
+        self.commands.run(self.delete_cmd(ssid, profile))
+        self.commands.run(["nmcli", "--wait", "30", "device", "wifi", "connect", ssid, "password", password], "connect")
+
+    def delete_wifi(self, ssid, profile=None):
+        self.status_label.setVisible(False)
+        self.commands.run(self.delete_cmd(ssid, profile), "delete")
+
+    def on_command_finished(self, tag, code, message):
+        if not tag or message == CANCELLED or not self.isVisible():
+            return
+        if not self.commands.busy("connect") and not self.commands.busy("up"):
+            self.header_label.setText("📡 Wi-Fi Switcher")
+        if code != 0:
+            message = message.removeprefix("Error: ") or f"exit code {code}"
+            if tag == "up":
+                # Profil tersimpan gagal (mis. password berubah): minta password
+                message += " Enter the password to recreate the profile."
+                row = self.rows.rows.get(self.up_ssid)
+                if row: row.set_expanded(True)
+            label = "Connect" if tag == "up" else tag.capitalize()
+            self.status_label.setText(f"{label} failed: {message}")
+            self.status_label.setVisible(True)
+        # Refresh tepat saat perintah selesai, bukan setelah jeda tetap
         self.refresh_list()
 
+    def closeEvent(self, event):
+        # Connect/delete yang sudah diminta tetap diselesaikan (delete tanpa
+        # connect = profil hilang): window disembunyikan, keluar setelah antrean kosong
+        if self.commands.busy():
+            event.ignore()
+            self.hide()
+            self.commands.drained.connect(QApplication.quit)
+            return
+        super().closeEvent(event)
+
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     ex = GlassWifi()
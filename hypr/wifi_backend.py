@@ -0,0 +1,521 @@
+import os
+import json
+import time
+import subprocess
+import threading
+from abc import ABCMeta, abstractmethod
+from collections import deque
+from PyQt6.QtCore import QObject, QTimer, QProcess, pyqtSignal, pyqtSlot
+from PyQt6.QtDBus import (QDBusConnection, QDBusMessage, QDBusVariant,
+                          QDBusPendingCallWatcher, QDBusPendingReply)
+from nmcli_parse import (aggregate, parse_wifi_list, parse_connections, parse_profile_ssids,
+                         profile_ssid_cmd, WIFI_LIST_CMD, CONNECTION_CMD)
+
+NM_SERVICE = "org.freedesktop.NetworkManager"
+NM_PATH = "/org/freedesktop/NetworkManager"
+NM_IFACE = "org.freedesktop.NetworkManager"
+DEVICE_IFACE = "org.freedesktop.NetworkManager.Device"
+WIRELESS_IFACE = "org.freedesktop.NetworkManager.Device.Wireless"
+AP_IFACE = "org.freedesktop.NetworkManager.AccessPoint"
+SETTINGS_PATH = "/org/freedesktop/NetworkManager/Settings"
+SETTINGS_IFACE = "org.freedesktop.NetworkManager.Settings"
+CONNECTION_IFACE = "org.freedesktop.NetworkManager.Settings.Connection"
+PROPS_IFACE = "org.freedesktop.DBus.Properties"
+DEVICE_TYPE_WIFI = 2
+
+SCAN_TIMEOUT = 15000
+EMIT_DELAY = 150
+# dbus-daemon menolak lebih dari 128 balasan tertunda per koneksi
+# (max_replies_per_connection), jadi sisanya antre di sini
+MAX_INFLIGHT = 32
+
+COMMAND_TIMEOUT = 40000
+CANCELLED = "cancelled"
+
+CACHE_HOME = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+CACHE_FILE = os.path.join(CACHE_HOME, "wifi-manager", "scan.json")
+CACHE_TTL = 15 * 60
+
+
+# ================= SCAN CACHE =================
+# Hasil scan terakhir (termasuk koneksi aktif) disimpan supaya popup bisa
+# langsung menampilkan daftar, sementara scan baru berjalan di belakang.
+def load_cache(ttl=CACHE_TTL, path=CACHE_FILE):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - data.get("time", 0) > ttl:
+        return None
+    return data.get("networks")
+
+
+def save_cache(networks, path=CACHE_FILE):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"time": time.time(), "networks": networks}, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+# ================= BACKEND INTERFACE =================
+# GlassWifi hanya bicara lewat dua signal ini, jadi sumber datanya bisa
+# diganti (nmcli, D-Bus, atau service palsu untuk testing, lihat
+# fake-networkmanager.py).
+class BackendMeta(type(QObject), ABCMeta):
+    # QObject punya metaclass sendiri (sip); digabung supaya @abstractmethod berlaku
+    pass
+
+
+class WifiBackend(QObject, metaclass=BackendMeta):
+    networks = pyqtSignal(list)
+    scanning = pyqtSignal(bool)
+
+    def __init__(self):
+        super().__init__()
+        self.networks.connect(save_cache)
+
+    def start(self):
+        self.rescan()
+
+    @abstractmethod
+    def rescan(self):
+        # Wajib emit scanning(True), networks(list) lalu scanning(False)
+        pass
+
+
+# ================= NMCLI BACKEND =================
+class NmcliBackend(WifiBackend):
+    def rescan(self):
+        self.scanning.emit(True)
+        threading.Thread(target=self.fetch_data, daemon=True).start()
+
+    def fetch_data(self):
+        aps, profiles = [], {}
+        try:
+            subprocess.run(["nmcli", "radio", "wifi", "on"], check=False)
+            # Satu batch: scan (list --rescan yes menunggu scan selesai) dan
+            # profil tersimpan diambil bersamaan
+            scan = subprocess.Popen(WIFI_LIST_CMD + ["--rescan", "yes"],
+                                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            conns = subprocess.Popen(CONNECTION_CMD, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            named = parse_connections(conns.communicate()[0].decode(errors="replace"))
+            if named:
+                # Cocokkan lewat 802-11-wireless.ssid, sama seperti backend D-Bus;
+                # nama profil hanya cadangan untuk profil yang SSID-nya tak terbaca
+                out = subprocess.run(profile_ssid_cmd(named.values()),
+                                     stdout=subprocess.PIPE, stderr=subprocess.DEVNULL).stdout
+                ssids = parse_profile_ssids(out.decode(errors="replace"))
+                found = set(ssids.values())
+                profiles = {n: u for n, u in named.items() if u not in found}
+                profiles.update(ssids)
+            aps = parse_wifi_list(scan.communicate()[0].decode(errors="replace"))
+        except OSError:
+            pass
+        self.networks.emit(aggregate(aps, profiles))
+        self.scanning.emit(False)
+
+
+# ================= D-BUS BACKEND =================
+# Bicara langsung ke NetworkManager: access point dibaca sekali, lalu
+# dijaga tetap up-to-date lewat signal AccessPointAdded/Removed dan
+# PropertiesChanged. Tidak ada proses yang di-spawn sama sekali, dan
+# semua panggilan async: GUI tidak pernah menunggu round-trip D-Bus.
+class DBusBackend(WifiBackend):
+    def __init__(self, bus=None):
+        super().__init__()
+        self.bus = bus or QDBusConnection.systemBus()
+        self.devices = {}   # path device -> path access point aktif
+        self.aps = {}       # path access point -> {ssid, signal}
+        self.profiles = {}  # path profil tersimpan -> (ssid, uuid)
+        self.pending = set()
+        self.loading = 0        # balasan load yang belum datang
+        self.generation = 0     # load_devices terbaru; balasan lama diabaikan
+        self.scan_wanted = False
+        self.calls = deque()    # panggilan yang menunggu slot MAX_INFLIGHT
+        self.inflight = 0
+
+        # Banyak signal datang beruntun saat scan; cukup emit sekali
+        self.emit_timer = QTimer(self)
+        self.emit_timer.setSingleShot(True)
+        self.emit_timer.setInterval(EMIT_DELAY)
+        self.emit_timer.timeout.connect(self.emit_networks)
+        self.last_emitted = None
+
+        self.scan_timer = QTimer(self)
+        self.scan_timer.setSingleShot(True)
+        self.scan_timer.timeout.connect(self.finish_scan)
+
+    @staticmethod
+    def available(bus=None):
+        bus = bus or QDBusConnection.systemBus()
+        if not bus.isConnected():
+            return False
+        reply = bus.interface().isServiceRegistered(NM_SERVICE)
+        return reply.isValid() and bool(reply.value())
+
+    def call(self, path, name, method, *args, done=None):
+        # QDBusMessage langsung, bukan QDBusInterface: konstruktornya sendiri
+        # melakukan introspeksi blocking. done menerima argumen balasan,
+        # atau None kalau error
+        msg = QDBusMessage.createMethodCall(NM_SERVICE, path, name, method)
+        msg.setArguments(list(args))
+        self.calls.append((msg, done))
+        self.next_call()
+
+    def next_call(self):
+        while self.calls and self.inflight < MAX_INFLIGHT:
+            msg, done = self.calls.popleft()
+            self.inflight += 1
+            watcher = QDBusPendingCallWatcher(self.bus.asyncCall(msg), self)
+            watcher.finished.connect(lambda w, done=done: self.on_reply(w, done))
+
+    def on_reply(self, watcher, done):
+        self.inflight -= 1
+        reply = QDBusPendingReply(watcher)
+        watcher.deleteLater()
+        if done is not None:
+            done(None if reply.isError() else reply.reply().arguments())
+        self.next_call()
+
+    def fetch(self, path, name, method, *args, done):
+        # Bagian dari snapshot: emit ditahan sampai semua balasan datang,
+        # supaya daftar tidak pernah tampil setengah jadi
+        self.loading += 1
+
+        def finished(args):
+            self.loading -= 1
+            done(args)
+            if not self.loading:
+                self.request_scans()
+                self.schedule_emit()
+
+        self.call(path, name, method, *args, done=finished)
+
+    def get_all(self, path, name, done):
+        self.fetch(path, PROPS_IFACE, "GetAll", name,
+                   done=lambda args: done(args[0] if args else None))
+
+    def start(self):
+        for sig, iface, slot in (
+            ("PropertiesChanged", PROPS_IFACE, self.on_properties_changed),
+            ("AccessPointAdded", WIRELESS_IFACE, self.on_ap_added),
+            ("AccessPointRemoved", WIRELESS_IFACE, self.on_ap_removed),
+            ("DeviceAdded", NM_IFACE, self.on_device_changed),
+            ("DeviceRemoved", NM_IFACE, self.on_device_changed),
+            ("NewConnection", SETTINGS_IFACE, self.on_profile_changed),
+            ("ConnectionRemoved", SETTINGS_IFACE, self.on_profile_removed),
+            ("Updated", CONNECTION_IFACE, self.on_profile_changed),
+        ):
+            # Path kosong = semua objek milik NetworkManager
+            self.bus.connect(NM_SERVICE, "", iface, sig, slot)
+
+        self.load_devices()
+        self.load_profiles()
+        self.rescan()
+
+    def load_devices(self):
+        self.devices.clear()
+        self.aps.clear()
+        self.generation += 1
+        gen = self.generation
+        self.fetch(NM_PATH, NM_IFACE, "GetDevices",
+                   done=lambda args: self.on_devices(args, gen))
+
+    def on_devices(self, args, gen):
+        if args is None or gen != self.generation:
+            return
+        for dev in args[0]:
+            dev = object_path(dev)
+            self.get_all(dev, DEVICE_IFACE, lambda props, dev=dev: self.on_device_props(dev, props, gen))
+
+    def on_device_props(self, dev, props, gen):
+        if not props or props.get("DeviceType") != DEVICE_TYPE_WIFI or gen != self.generation:
+            return
+        self.get_all(dev, WIRELESS_IFACE, lambda wifi, dev=dev: self.on_wireless(dev, wifi, gen))
+
+    def on_wireless(self, dev, wifi, gen):
+        if gen != self.generation:
+            return
+        wifi = wifi or {}
+        self.devices[dev] = object_path(wifi.get("ActiveAccessPoint", "/"))
+        for ap in wifi.get("AccessPoints", []):
+            self.load_ap(object_path(ap))
+
+    def load_ap(self, path):
+        self.get_all(path, AP_IFACE, lambda props: self.on_ap(path, props))
+
+    def on_ap(self, path, props):
+        if props is None:
+            self.aps.pop(path, None)
+            return
+        self.aps[path] = {"ssid": decode_ssid(props.get("Ssid", b"")),
+                          "signal": strength(props.get("Strength", 0)),
+                          "bssid": props.get("HwAddress", ""),
+                          "freq": int(props.get("Frequency", 0)),
+                          "security": security(props)}
+
+    def load_profiles(self):
+        self.profiles.clear()
+        self.fetch(SETTINGS_PATH, SETTINGS_IFACE, "ListConnections", done=self.on_profiles)
+
+    def on_profiles(self, args):
+        for path in (args[0] if args else []):
+            self.load_profile(object_path(path))
+
+    def load_profile(self, path):
+        self.fetch(path, CONNECTION_IFACE, "GetSettings",
+                   done=lambda args: self.on_profile(path, args))
+
+    def on_profile(self, path, args):
+        if not args:
+            self.profiles.pop(path, None)
+            return
+        settings = args[0]
+        wifi = settings.get("802-11-wireless")
+        if wifi is None or "ssid" not in wifi:
+            return
+        self.profiles[path] = (decode_ssid(wifi["ssid"]), settings["connection"]["uuid"])
+
+    def snapshot(self):
+        active = set(self.devices.values())
+        profiles = dict(self.profiles.values())
+        return aggregate(({"active": path in active, **ap} for path, ap in self.aps.items()), profiles)
+
+    def schedule_emit(self):
+        if not self.emit_timer.isActive():
+            self.emit_timer.start()
+
+    def emit_networks(self):
+        if self.loading:
+            return
+        devs = self.snapshot()
+        if devs != self.last_emitted:
+            self.last_emitted = devs
+            self.networks.emit(devs)
+
+    # ---------- Scan ----------
+    def rescan(self):
+        # Setara `nmcli radio wifi on`
+        self.call(NM_PATH, PROPS_IFACE, "Set", NM_IFACE, "WirelessEnabled", QDBusVariant(True))
+
+        self.scanning.emit(True)
+        self.scan_timer.start(SCAN_TIMEOUT)
+        self.scan_wanted = True
+        if not self.devices and not self.loading:
+            # Belum ada device wifi (mis. adapter baru dicolok): baca ulang dulu
+            self.load_devices()
+        self.request_scans()
+
+    def request_scans(self):
+        # Daftar device masih dimuat: scan diminta begitu balasannya lengkap
+        if not self.scan_wanted or self.loading:
+            return
+        self.scan_wanted = False
+        if not self.devices:
+            self.finish_scan()
+            return
+        self.pending = set(self.devices)
+        for dev in self.devices:
+            self.call(dev, WIRELESS_IFACE, "RequestScan", {},
+                      done=lambda args, dev=dev: self.on_scan_requested(args, dev))
+
+    def on_scan_requested(self, args, dev):
+        # Ditolak (mis. baru saja scan): hasil yang ada sudah yang terbaru
+        if args is None:
+            self.scan_done(dev)
+
+    def scan_done(self, dev):
+        self.pending.discard(dev)
+        if not self.pending:
+            self.finish_scan()
+
+    def finish_scan(self):
+        self.scan_timer.stop()
+        self.scan_wanted = False
+        self.pending.clear()
+        self.emit_timer.stop()
+        self.emit_networks()
+        self.scanning.emit(False)
+
+    # ---------- Signals ----------
+    @pyqtSlot(QDBusMessage)
+    def on_properties_changed(self, msg):
+        args = msg.arguments()
+        if len(args) < 2:
+            return
+        iface, changed, path = args[0], args[1], msg.path()
+
+        if iface == AP_IFACE and path in self.aps:
+            ap = self.aps[path]
+            if "Ssid" in changed:
+                ap["ssid"] = decode_ssid(changed["Ssid"])
+            if "Strength" in changed:
+                ap["signal"] = strength(changed["Strength"])
+            self.schedule_emit()
+        elif iface == WIRELESS_IFACE and path in self.devices:
+            if "ActiveAccessPoint" in changed:
+                self.devices[path] = object_path(changed["ActiveAccessPoint"])
+                self.schedule_emit()
+            # LastScan berubah = scan untuk device ini selesai
+            if "LastScan" in changed and path in self.pending:
+                self.scan_done(path)
+        elif iface == NM_IFACE and "ActiveConnections" in changed:
+            # Koneksi naik/turun: AP aktif tiap device dibaca ulang
+            for dev in self.devices:
+                self.get_all(dev, WIRELESS_IFACE, lambda wifi, dev=dev: self.on_active_ap(dev, wifi))
+
+    def on_active_ap(self, dev, wifi):
+        if wifi is not None and dev in self.devices:
+            self.devices[dev] = object_path(wifi.get("ActiveAccessPoint", "/"))
+
+    @pyqtSlot(QDBusMessage)
+    def on_ap_added(self, msg):
+        if msg.path() in self.devices and msg.arguments():
+            self.load_ap(object_path(msg.arguments()[0]))
+
+    @pyqtSlot(QDBusMessage)
+    def on_ap_removed(self, msg):
+        if msg.path() in self.devices and msg.arguments():
+            self.aps.pop(object_path(msg.arguments()[0]), None)
+            self.schedule_emit()
+
+    @pyqtSlot(QDBusMessage)
+    def on_profile_changed(self, msg):
+        # NewConnection membawa path di argumen, Updated dikirim oleh profilnya
+        path = object_path(msg.arguments()[0]) if msg.arguments() else msg.path()
+        self.load_profile(path)
+
+    @pyqtSlot(QDBusMessage)
+    def on_profile_removed(self, msg):
+        if msg.arguments():
+            self.profiles.pop(object_path(msg.arguments()[0]), None)
+            self.schedule_emit()
+
+    @pyqtSlot(QDBusMessage)
+    def on_device_changed(self, msg):
+        self.load_devices()
+
+
+# ================= COMMAND QUEUE =================
+# Aksi nmcli (connect, delete, ...) dijalankan satu per satu lewat QProcess,
+# tidak pernah memblok GUI. Hasilnya (exit code + stderr) dikirim balik
+# lewat signal, jadi UI bisa refresh tepat saat perintah selesai.
+class CommandQueue(QObject):
+    finished = pyqtSignal(str, int, str)   # tag, exit code (-1 = gagal), pesan
+    drained = pyqtSignal()                 # antrean kosong, tidak ada yang jalan
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.queue = deque()
+        self.proc = None
+        self.tag = None
+        self.error = None
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.on_timeout)
+
+    def run(self, args, tag="", timeout=COMMAND_TIMEOUT):
+        self.queue.append((args, tag, timeout))
+        if self.proc is None:
+            self.next()
+
+    def busy(self, tag=None):
+        if tag is None:
+            return self.proc is not None or bool(self.queue)
+        return self.tag == tag or any(t == tag for _, t, _ in self.queue)
+
+    def cancel(self, tag=None):
+        # Tanpa tag = batalkan semua, termasuk yang sedang jalan
+        self.queue = deque(job for job in self.queue if tag is not None and job[1] != tag)
+        if self.proc is not None and (tag is None or self.tag == tag):
+            self.error = CANCELLED
+            self.proc.kill()
+
+    def next(self):
+        if not self.queue:
+            self.drained.emit()
+            return
+        args, self.tag, timeout = self.queue.popleft()
+        self.error = None
+        self.proc = QProcess(self)
+        self.proc.finished.connect(self.on_finished)
+        self.proc.errorOccurred.connect(self.on_error)
+        self.proc.start(args[0], args[1:])
+        self.timer.start(timeout)
+
+    def on_timeout(self):
+        if self.proc is not None:
+            self.error = f"timeout after {self.timer.interval() / 1000:g}s"
+            self.proc.kill()
+
+    def on_error(self, error):
+        # Program tidak ada / tidak bisa dijalankan: finished tidak akan datang
+        if error == QProcess.ProcessError.FailedToStart:
+            self.error = self.proc.errorString()
+            self.on_finished(-1, QProcess.ExitStatus.CrashExit)
+
+    def on_finished(self, code, status):
+        proc, tag = self.proc, self.tag
+        if proc is None:
+            return
+        self.timer.stop()
+        self.proc = self.tag = None
+
+        err = bytes(proc.readAllStandardError()).decode(errors="replace").strip()
+        if self.error is not None or status != QProcess.ExitStatus.NormalExit:
+            code, err = -1, self.error or err or "crashed"
+        proc.deleteLater()
+
+        self.finished.emit(tag, code, err)
+        self.next()
+
+
+def object_path(value):
+    return value.path() if hasattr(value, "path") else str(value)
+
+
+def decode_ssid(value):
+    return bytes(value).decode("utf-8", errors="replace")
+
+
+def security(props):
+    # Ringkasan seperti kolom SECURITY nmcli, dari flag AccessPoint NM
+    rsn, wpa = int(props.get("RsnFlags", 0)), int(props.get("WpaFlags", 0))
+    parts = []
+    if wpa:
+        parts.append("WPA1")
+    if rsn & 0x100:
+        parts.append("WPA2")
+    if rsn & 0x400:
+        parts.append("WPA3")
+    if (rsn | wpa) & 0x200:
+        parts.append("802.1X")
+    if rsn & 0x800:
+        parts.append("OWE")
+    if not parts and int(props.get("Flags", 0)) & 0x1:
+        parts.append("WEP")
+    return " ".join(parts)
+
+
+def strength(value):
+    # Tipe D-Bus 'y' (byte) sampai di PyQt sebagai bytes 1 karakter
+    if isinstance(value, (bytes, bytearray)):
+        return value[0] if value else 0
+    return int(value)
+
+
+def make_backend():
+    # WIFI_BACKEND=nmcli|dbus memaksa salah satu; default D-Bus kalau
+    # NetworkManager ada di system bus (DBUS_SYSTEM_BUS_ADDRESS dihormati)
+    choice = os.environ.get("WIFI_BACKEND", "").lower()
+    if choice == "nmcli":
+        return NmcliBackend()
+    if choice == "dbus" or DBusBackend.available():
+        return DBusBackend()
+    return NmcliBackend()
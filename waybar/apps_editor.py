@@ -1,6 +1,9 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
-import json, os, re, glob
+import json, os, re
+
+from desktop_entries import system_apps
+from icon_theme import IconResolver
 
 # Path konfigurasi Waybar
 CONFIG_PATH = os.path.expanduser("~/.config/waybar/config")
@@ -24,6 +27,7 @@ class WaybarManager:
             "red": "#f43f5e"
         }
 
+        self.icons = IconResolver()
         self.load_config()
         self.setup_styles()
         self.build_main_layout()
@@ -44,20 +48,11 @@ class WaybarManager:
             print(f"Error loading config: {e}")
             self.config = {"group/apps": {"modules": []}}
 
-    def find_icon(self, icon_name):
+    def find_icon(self, icon_name, size=24):
         if not icon_name: return ""
         if os.path.isabs(icon_name): return icon_name
-        
-        paths = [
-            os.path.expanduser("~/.local/share/icons"),
-            "/usr/share/icons/hicolor/scalable/apps",
-            "/usr/share/icons/hicolor/48x48/apps",
-            "/usr/share/pixmaps"
-        ]
-        for p in paths:
-            match = glob.glob(f"{p}/{icon_name}.*")
-            if match: return match[0]
-        return ""
+        # Ikut theme aktif + Inherits; index-nya di-cache ke disk
+        return self.icons.find(icon_name, size)
 
     # ---------- UI Components ----------
     def setup_styles(self):
@@ -212,25 +207,8 @@ class WaybarManager:
         self.create_btn(dialog, "CONFIRM SELECTION", self.colors["accent"], on_select).pack(pady=30)
 
     def get_system_apps(self):
-        found = []
-        for path in ["/usr/share/applications", os.path.expanduser("~/.local/share/applications")]:
-            if not os.path.exists(path): continue
-            for f in os.listdir(path):
-                if f.endswith(".desktop"):
-                    try:
-                        with open(os.path.join(path, f), 'r') as file:
-                            content = file.read()
-                            name = re.search(r"^Name=(.*)", content, re.M)
-                            exe = re.search(r"^Exec=([^%\n]*)", content, re.M)
-                            ico = re.search(r"^Icon=(.*)", content, re.M)
-                            if name and exe:
-                                found.append({
-                                    "name": name.group(1),
-                                    "exec": exe.group(1),
-                                    "icon_id": ico.group(1) if ico else ""
-                                })
-                    except: continue
-        return sorted(found, key=lambda x: x["name"])
+        # Index desktop entry (semua XDG data dir) di-cache per direktori
+        return system_apps()
 
     def delete_item(self, key):
         if key in self.config: del self.config[key]
@@ -0,0 +1,164 @@
+import os, re, json
+
+CACHE_HOME = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+CACHE_FILE = os.path.join(CACHE_HOME, "waybar-apps", "desktop-entries.json")
+CACHE_VERSION = 2
+
+# Export Flatpak/Snap biasanya sudah ada di XDG_DATA_DIRS, tapi tidak
+# kalau aplikasi dijalankan dari sesi yang environment-nya minimal
+EXTRA_DIRS = [
+    os.path.expanduser("~/.local/share/flatpak/exports/share"),
+    "/var/lib/flatpak/exports/share",
+    "/var/lib/snapd/desktop",
+]
+
+# Field code Exec (%f, %U, %i, ...) tidak berarti apa-apa di on-click Waybar
+FIELD_CODE = re.compile(r"%(.)")
+FIELD_CODES = set("fFuUdDnNickvm")
+
+
+# ================= XDG DIRS =================
+def data_dirs():
+    home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    system = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+    dirs = []
+    # Urutan = prioritas: entry di direktori awal menutupi yang sama di belakang
+    for d in [home] + system.split(":") + EXTRA_DIRS:
+        d = os.path.normpath(d) if d else ""
+        if d and d not in dirs:
+            dirs.append(d)
+    return dirs
+
+
+def application_dirs():
+    return [os.path.join(d, "applications") for d in data_dirs()]
+
+
+# ================= PARSER =================
+def parse_entry(path):
+    # Hanya grup [Desktop Entry]; Name= di [Desktop Action ...] diabaikan
+    fields = {}
+    in_entry = False
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("["):
+                if in_entry:
+                    break
+                in_entry = line == "[Desktop Entry]"
+                continue
+            if in_entry:
+                key, sep, value = line.partition("=")
+                if sep:
+                    fields.setdefault(key.strip(), value.strip())
+
+    # None = tersembunyi, tapi tetap disimpan supaya menutupi entry
+    # dengan ID sama di direktori berprioritas lebih rendah
+    if fields.get("Type", "Application") != "Application":
+        return None
+    if fields.get("NoDisplay") == "true" or fields.get("Hidden") == "true":
+        return None
+    if not fields.get("Name") or not fields.get("Exec"):
+        return None
+    return {
+        "name": fields["Name"],
+        "exec": strip_field_codes(fields["Exec"]),
+        "icon_id": fields.get("Icon", ""),
+    }
+
+
+def strip_field_codes(exe):
+    # Satu pass kiri ke kanan supaya '%%f' jadi '%f', bukan '%'. Spasi di
+    # tengah dibiarkan: bisa saja bagian dari argumen yang di-quote
+    def field(m):
+        c = m.group(1)
+        if c == "%":
+            return "%"
+        return "" if c in FIELD_CODES else m.group(0)
+    return FIELD_CODE.sub(field, exe).strip()
+
+
+def scan_dir(appdir):
+    # Desktop ID: path relatif dengan '/' diganti '-' (kde4/foo.desktop -> kde4-foo.desktop)
+    entries, mtimes = {}, {}
+    for root, dirs, files in os.walk(appdir):
+        try:
+            mtimes[root] = os.stat(root).st_mtime_ns
+        except OSError:
+            continue
+        for name in files:
+            if not name.endswith(".desktop"):
+                continue
+            path = os.path.join(root, name)
+            desktop_id = os.path.relpath(path, appdir).replace(os.sep, "-")
+            try:
+                entries[desktop_id] = parse_entry(path)
+            except OSError:
+                continue
+    return {"mtimes": mtimes, "entries": entries}
+
+
+def is_fresh(cached):
+    # Direktori berubah mtime-nya saat file ditambah, dihapus atau diganti
+    # lewat rename (cara package manager & editor menulis)
+    for d, mtime in cached.get("mtimes", {}).items():
+        try:
+            if os.stat(d).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return bool(cached.get("mtimes"))
+
+
+# ================= INDEX =================
+def atomic_json_write(path, data):
+    # Tulis ke file sementara lalu rename, supaya Waybar yang refresh
+    # bersamaan tidak pernah membaca JSON setengah jadi
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def load_index(path=CACHE_FILE):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CACHE_VERSION:
+        return {}
+    return data.get("dirs", {})
+
+
+def save_index(dirs, path=CACHE_FILE):
+    try:
+        atomic_json_write(path, {"version": CACHE_VERSION, "dirs": dirs})
+    except OSError:
+        pass
+
+
+def system_apps(path=CACHE_FILE):
+    cached = load_index(path)
+    dirs, dirty = {}, False
+    for appdir in application_dirs():
+        if not os.path.isdir(appdir):
+            dirty = dirty or appdir in cached
+            continue
+        entry = cached.get(appdir)
+        # Hanya direktori yang berubah yang di-parse ulang
+        if entry is None or not is_fresh(entry):
+            entry = scan_dir(appdir)
+            dirty = True
+        dirs[appdir] = entry
+    if dirty or len(dirs) != len(cached):
+        save_index(dirs, path)
+
+    found = {}
+    for entry in dirs.values():
+        for desktop_id, app in entry["entries"].items():
+            found.setdefault(desktop_id, app)
+    return sorted((a for a in found.values() if a), key=lambda x: x["name"].lower())
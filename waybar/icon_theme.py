@@ -0,0 +1,252 @@
+import os, json, subprocess, configparser
+
+from desktop_entries import CACHE_HOME, data_dirs, atomic_json_write
+
+CACHE_FILE = os.path.join(CACHE_HOME, "waybar-apps", "icon-index.json")
+CACHE_VERSION = 1
+ICON_EXTS = (".png", ".svg", ".xpm")
+GTK_SETTINGS = [os.path.join(os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config"), d, "settings.ini")
+                for d in ("gtk-4.0", "gtk-3.0")]
+
+
+# ================= THEME =================
+def base_dirs():
+    # Urutan pencarian sesuai Icon Theme Specification
+    dirs = [os.path.expanduser("~/.icons")] + [os.path.join(d, "icons") for d in data_dirs()]
+    return dirs + [os.path.join(d, "pixmaps") for d in data_dirs()]
+
+
+def current_theme():
+    # GTK di Wayland membaca gsettings; settings.ini sebagai cadangan
+    try:
+        out = subprocess.run(["gsettings", "get", "org.gnome.desktop.interface", "icon-theme"],
+                             capture_output=True, text=True, timeout=2).stdout.strip().strip("'")
+        if out:
+            return out
+    except (OSError, subprocess.SubprocessError):
+        pass
+    for path in GTK_SETTINGS:
+        cfg = configparser.ConfigParser(interpolation=None)
+        try:
+            cfg.read(path)
+        except configparser.Error:
+            continue
+        name = cfg.get("Settings", "gtk-icon-theme-name", fallback="").strip()
+        if name:
+            return name
+    return "hicolor"
+
+
+def read_index_theme(path):
+    cfg = configparser.ConfigParser(interpolation=None, strict=False)
+    cfg.optionxform = str
+    try:
+        cfg.read(path, encoding="utf-8")
+    except (configparser.Error, UnicodeDecodeError):
+        return [], []
+    if not cfg.has_section("Icon Theme"):
+        return [], []
+    head = cfg["Icon Theme"]
+    inherits = [t.strip() for t in head.get("Inherits", "").split(",") if t.strip()]
+    names = head.get("Directories", "").split(",") + head.get("ScaledDirectories", "").split(",")
+
+    subdirs = []
+    for name in dict.fromkeys(n.strip() for n in names if n.strip()):
+        if not cfg.has_section(name):
+            continue
+        sec = cfg[name]
+        try:
+            size = int(sec.get("Size", "0"))
+            subdirs.append({
+                "name": name,
+                "size": size,
+                "scale": int(sec.get("Scale", "1")),
+                "type": sec.get("Type", "Threshold"),
+                "min": int(sec.get("MinSize", size)),
+                "max": int(sec.get("MaxSize", size)),
+                "threshold": int(sec.get("Threshold", "2")),
+            })
+        except ValueError:
+            continue
+    return inherits, subdirs
+
+
+# ================= SIZE MATCHING =================
+def matches_size(d, size, scale):
+    if d["scale"] != scale:
+        return False
+    if d["type"] == "Fixed":
+        return d["size"] == size
+    if d["type"] == "Scalable":
+        return d["min"] <= size <= d["max"]
+    return d["size"] - d["threshold"] <= size <= d["size"] + d["threshold"]
+
+
+def size_distance(d, size, scale):
+    want = size * scale
+    if d["type"] == "Scalable":
+        low, high = d["min"] * d["scale"], d["max"] * d["scale"]
+    elif d["type"] == "Threshold":
+        low = (d["size"] - d["threshold"]) * d["scale"]
+        high = (d["size"] + d["threshold"]) * d["scale"]
+    else:
+        low = high = d["size"] * d["scale"]
+    if want < low:
+        return low - want
+    if want > high:
+        return want - high
+    return 0
+
+
+# ================= INDEX =================
+def stat_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def is_fresh(cached):
+    return all(stat_mtime(p) == m for p, m in cached["mtimes"].items())
+
+
+def list_icons(path):
+    icons = {}
+    try:
+        names = os.listdir(path)
+    except OSError:
+        return icons
+    for f in names:
+        stem, ext = os.path.splitext(f)
+        # Kalau satu nama punya beberapa format, png > svg > xpm
+        if ext in ICON_EXTS and (stem not in icons or ICON_EXTS.index(ext) < ICON_EXTS.index(icons[stem])):
+            icons[stem] = ext
+    return icons
+
+
+def scan_theme(theme, bases):
+    # mtime dicatat juga untuk direktori yang belum ada (None), supaya
+    # theme yang baru di-install ikut terdeteksi
+    entry = {"mtimes": {}, "inherits": [], "dirs": [], "icons": {}}
+    subdirs = None
+    for base in bases:
+        root = os.path.join(base, theme)
+        entry["mtimes"][root] = stat_mtime(root)
+        index = os.path.join(root, "index.theme")
+        if subdirs is None and os.path.isfile(index):
+            entry["mtimes"][index] = stat_mtime(index)
+            entry["inherits"], subdirs = read_index_theme(index)
+    # index.theme diambil dari base pertama, isinya dicari di semua base
+    for base in bases:
+        for sub in subdirs or []:
+            path = os.path.join(base, theme, sub["name"])
+            mtime = stat_mtime(path)
+            if mtime is None:
+                continue
+            entry["mtimes"][path] = mtime
+            i = len(entry["dirs"])
+            entry["dirs"].append(dict(sub, path=path))
+            for stem, ext in list_icons(path).items():
+                entry["icons"].setdefault(stem, []).append([i, ext])
+    return entry
+
+
+def scan_unthemed(bases):
+    entry = {"mtimes": {}, "icons": {}}
+    for base in bases:
+        entry["mtimes"][base] = stat_mtime(base)
+        for stem, ext in list_icons(base).items():
+            entry["icons"].setdefault(stem, os.path.join(base, stem + ext))
+    return entry
+
+
+def load_index(path=CACHE_FILE):
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != CACHE_VERSION:
+        return {}
+    return data
+
+
+def save_index(data, path=CACHE_FILE):
+    try:
+        atomic_json_write(path, dict(data, version=CACHE_VERSION))
+    except OSError:
+        pass
+
+
+# ================= RESOLVER =================
+# Index seluruh rantai theme (theme aktif -> Inherits -> hicolor) dibangun
+# sekali dan disimpan ke disk; tiap theme di-scan ulang hanya kalau mtime
+# direktorinya berubah. Lookup (nama, ukuran, scale) di-memo di memori.
+class IconResolver:
+    def __init__(self, theme=None, path=CACHE_FILE):
+        self.theme = theme
+        self.path = path
+        self.chain = None
+        self.themes = {}
+        self.unthemed = {}
+        self.lookups = {}
+
+    def load(self):
+        if self.theme is None:
+            self.theme = current_theme()
+        bases = base_dirs()
+        cached = load_index(self.path)
+        old = cached.get("themes", {})
+        dirty = cached.get("bases") != bases
+
+        self.chain, self.themes = [], {}
+        queue = [self.theme]
+        while queue:
+            theme = queue.pop(0)
+            if theme in self.themes:
+                continue
+            entry = old.get(theme)
+            if dirty or entry is None or not is_fresh(entry):
+                entry = scan_theme(theme, bases)
+                dirty = True
+            self.themes[theme] = entry
+            self.chain.append(theme)
+            queue += entry["inherits"]
+            # hicolor selalu jadi fallback terakhir
+            if not queue and "hicolor" not in self.themes:
+                queue.append("hicolor")
+
+        self.unthemed = cached.get("unthemed")
+        if dirty or self.unthemed is None or not is_fresh(self.unthemed):
+            self.unthemed = scan_unthemed(bases)
+            dirty = True
+        if dirty or set(old) != set(self.themes):
+            save_index({"bases": bases, "themes": self.themes, "unthemed": self.unthemed}, self.path)
+
+    def find(self, name, size=24, scale=1):
+        # Icon= di .desktop kadang ditulis lengkap dengan ekstensi
+        stem, ext = os.path.splitext(name)
+        if ext in ICON_EXTS:
+            name = stem
+        key = (name, size, scale)
+        if key not in self.lookups:
+            if self.chain is None:
+                self.load()
+            self.lookups[key] = self.lookup(name, size, scale)
+        return self.lookups[key]
+
+    def lookup(self, name, size, scale):
+        for theme in self.chain:
+            entry = self.themes[theme]
+            best, distance = None, None
+            for i, ext in entry["icons"].get(name, []):
+                d = entry["dirs"][i]
+                path = os.path.join(d["path"], name + ext)
+                if matches_size(d, size, scale):
+                    return path
+                dist = size_distance(d, size, scale)
+                if distance is None or dist < distance:
+                    best, distance = path, dist
+            if best is not None:
+                return best
+        return self.unthemed["icons"].get(name, "")